@@ -0,0 +1,30 @@
+"""Baseline options shared by the benchmark scripts.
+
+--save writes the medians of a run to a JSON file; --baseline compares a
+run against such a file and reports every median that is slower by more
+than --tolerance (default 25%).
+"""
+import json
+
+
+def add_baseline_arguments(parser):
+    parser.add_argument("--save", help="write the medians to this JSON file")
+    parser.add_argument("--baseline", help="compare against medians in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+
+
+def check_baseline(args, medians):
+    # Hasilnya status keluar: 1 bila ada median yang lebih lambat dari baseline
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(medians, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = [key for key, value in medians.items()
+                   if key in baseline and value > baseline[key] * (1 + args.tolerance)]
+    for key in regressions:
+        print(f"REGRESSION {key}: {medians[key] * 1000:.1f} ms vs {baseline[key] * 1000:.1f} ms")
+    return 1 if regressions else 0
@@ -0,0 +1,201 @@
+"""Parser and render micro-benchmarks on synthetic modem output.
+
+Runs the CPU-heavy paths of the editor against generated "DB p" and
+"DB all" output of increasing size, in process and without a modem:
+
+    parse_full    TableParser on the whole output plus TableData.extend
+    parse_stream  the same output fed in 4 KiB chunks, as it arrives
+    render        streaming rows into DBTableModel with a QTableView attached
+    paint         showing a finished table and painting the visible cells
+    edit          1000 cell edits through DBTableModel.setData
+    index         ValueIndex.index_table for the value search
+    diff          diff_tables against a copy with 1% of the cells changed
+    table_list    parse_table_list on "DB all" output
+    filter        TableListModel.set_filter for a few typical queries
+
+Usage:
+
+    python benchmarks/bench_parse.py --save baseline.json
+    python benchmarks/bench_parse.py --baseline baseline.json
+    python benchmarks/bench_parse.py --rows 100 1000 10000 100000 --columns 8 40
+
+Besides the baseline check (exit status 1 when a median is slower than the
+baseline by more than --tolerance), every case reports its time per row or
+per table name and flags it as NONLINEAR when that cost at the largest size
+exceeds the cost at the smallest size by more than --scaling times.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableView  # noqa: E402
+
+from baseline import add_baseline_arguments, check_baseline  # noqa: E402
+from core import (STREAM_BATCH_ROWS, TableData, TableParser, ValueIndex,  # noqa: E402
+                  diff_tables, parse_table_list)
+from main import DBTableModel, TableListModel  # noqa: E402
+from mock_modem import MockModem, generate_tables  # noqa: E402
+
+CHUNK_SIZE = 4096
+EDITS = 1000
+QUERIES = ("wlan", "WANC", "dev", "tbl00", "xyz")
+
+
+def table_output(rows, columns):
+    return MockModem(generate_tables(1, rows, columns)).render_table("MockTbl000")
+
+
+def list_output(count):
+    return MockModem(generate_tables(count, 0, 0)).execute("sendcmd 1 DB all")
+
+
+def parse(text):
+    data = TableData()
+    data.extend(TableParser().feed(text))
+    return data
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def bench_parse_stream(text):
+    parser = TableParser()
+    data = TableData()
+    for start in range(0, len(text), CHUNK_SIZE):
+        data.extend(parser.feed(text[start:start + CHUNK_SIZE]))
+
+
+def bench_render(app, rows):
+    model = DBTableModel()
+    view = QTableView()
+    view.setModel(model)
+    model.set_table(TableData())
+    for start in range(0, len(rows), STREAM_BATCH_ROWS):
+        model.append_rows(rows[start:start + STREAM_BATCH_ROWS])
+        app.processEvents()
+
+
+def bench_paint(app, data):
+    model = DBTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.resize(1200, 800)
+    model.set_table(data)
+    view.viewport().grab()
+
+
+def bench_edit(data):
+    model = DBTableModel()
+    model.set_table(data)
+    columns = len(data.columns)
+    for i in range(EDITS):
+        model.setData(model.index(i % data.row_count, i % columns), f"edited{i}")
+
+
+def bench_index(data):
+    ValueIndex().index_table("MockTbl000", data)
+
+
+def changed_copy(data):
+    copy = TableData()
+    copy.columns = list(data.columns)
+    copy.row_count = data.row_count
+    copy.values = {name: list(values) for name, values in data.values.items()}
+    for i in range(0, data.row_count * len(data.columns), 100):
+        column = copy.columns[i % len(copy.columns)]
+        copy.values[column][i // len(copy.columns)] = "changed"
+    return copy
+
+
+def bench_filter(model, names):
+    model.set_tables(names)
+    for query in QUERIES:
+        model.set_filter(query)
+
+
+def run_cases(app, args):
+    # Hasilnya {nama kasus: (detik, jumlah unit)} untuk satu putaran
+    timings = {}
+    for columns in args.columns:
+        for rows in args.rows:
+            if rows * columns > args.max_cells:
+                continue
+            size = f"{rows}x{columns}"
+            text = table_output(rows, columns)
+            records = TableParser().feed(text)
+            data = parse(text)
+            timings[f"parse_full {size}"] = (timed(parse, text), rows)
+            timings[f"parse_stream {size}"] = (timed(bench_parse_stream, text), rows)
+            timings[f"render {size}"] = (timed(bench_render, app, records), rows)
+            timings[f"paint {size}"] = (timed(bench_paint, app, data), rows)
+            timings[f"edit {size}"] = (timed(bench_edit, data), EDITS)
+            timings[f"index {size}"] = (timed(bench_index, data), rows)
+            copy = changed_copy(data)
+            timings[f"diff {size}"] = (timed(diff_tables, data, copy), rows)
+    model = TableListModel()
+    for count in args.tables:
+        text = list_output(count)
+        names = parse_table_list(text)
+        timings[f"table_list {count}"] = (timed(parse_table_list, text), count)
+        timings[f"filter {count}"] = (timed(bench_filter, model, names), count)
+    return timings
+
+
+def scaling_report(medians, units, limit):
+    # Bandingkan biaya per unit ukuran terbesar dan terkecil per kasus/lebar
+    groups = {}
+    for key in medians:
+        case, size = key.split(" ")
+        width = size.split("x")[1] if "x" in size else ""
+        groups.setdefault((case, width), []).append(key)
+    nonlinear = []
+    for keys in groups.values():
+        if len(keys) < 2:
+            continue
+        keys.sort(key=lambda key: units[key])
+        small, large = keys[0], keys[-1]
+        if units[small] == units[large]:
+            continue
+        ratio = (medians[large] / units[large]) / max(medians[small] / units[small], 1e-12)
+        if ratio > limit:
+            nonlinear.append(f"NONLINEAR {large}: {ratio:.1f}x the per-unit cost of {small}")
+    return nonlinear
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--columns", type=int, nargs="+", default=[8, 40], help="table widths")
+    parser.add_argument("--max-cells", type=int, default=1_000_000, help="skip sizes above rows x columns")
+    parser.add_argument("--tables", type=int, nargs="+", default=[100, 1000, 10000], help="sizes of DB all")
+    add_baseline_arguments(parser)
+    parser.add_argument("--scaling", type=float, default=3.0,
+                        help="allowed growth of the per-row cost from the smallest to the largest size")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    runs = [run_cases(app, args) for _ in range(args.runs)]
+    units = {key: unit for key, (_, unit) in runs[0].items()}
+    medians = {key: statistics.median(run[key][0] for run in runs) for key in runs[0]}
+    for key, value in medians.items():
+        print(f"{key:24s} {value * 1000:10.2f} ms {value / units[key] * 1e6:10.2f} us/unit")
+
+    nonlinear = scaling_report(medians, units, args.scaling)
+    for line in nonlinear:
+        print(line)
+
+    return check_baseline(args, medians)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
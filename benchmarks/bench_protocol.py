@@ -0,0 +1,110 @@
+"""Protocol benchmark against the bundled mock modem (mock_modem.py).
+
+Measures connect time, table-list time, table fetch throughput, full
+database read time (all tables, spread over --sessions telnet sessions) and
+commit throughput over a real telnet connection, with the mock server
+running in its own process. Usage:
+
+    python benchmarks/bench_protocol.py --save baseline.json
+    python benchmarks/bench_protocol.py --baseline baseline.json
+    python benchmarks/bench_protocol.py --rows 5000 --byte-delay 0.00001 --chunk 512
+    python benchmarks/bench_protocol.py --command-delay 0.05 --sessions 4
+
+With --baseline the script exits with status 1 when a median time is slower
+than the baseline by more than --tolerance (default 25%).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from baseline import add_baseline_arguments, check_baseline  # noqa: E402
+from core import TelnetSession, parse_table_list, set_command  # noqa: E402
+
+
+def start_server(args):
+    command = [sys.executable, os.path.join(ROOT, "mock_modem.py"), "--port", "0",
+               "--tables", str(args.tables), "--rows", str(args.rows), "--columns", str(args.columns),
+               "--byte-delay", str(args.byte_delay), "--command-delay", str(args.command_delay),
+               "--chunk", str(args.chunk), "--max-sessions", str(args.max_sessions)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    address = server.stdout.readline().split()[-1]
+    return server, address
+
+
+def run_once(address, args):
+    timings = {}
+    session = TelnetSession()
+    try:
+        start = time.perf_counter()
+        session.connect(address, "root", "Zte521")
+        timings["connect"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tables = parse_table_list(session.command("sendcmd 1 DB all"))
+        timings["table_list"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = session.read_table(tables[1])
+        timings["fetch"] = time.perf_counter() - start
+        rows = data.row_count
+
+        if args.sessions > 1:
+            session.open_pool(args.sessions)
+        start = time.perf_counter()
+        session.read_tables(tables, lambda name, table: None)
+        timings["read_all"] = time.perf_counter() - start
+        parallel = session.parallelism
+
+        cells = min(args.cells, rows)
+        commands = [set_command(tables[1], row, "Param00", f"bench{row}") for row in range(cells)]
+        start = time.perf_counter()
+        failed = session.set_batch(commands)
+        timings["commit"] = time.perf_counter() - start
+        if failed:
+            raise RuntimeError(f"{failed} of {cells} set commands failed")
+    finally:
+        session.close()
+    return timings, rows, cells, parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=20, help="tables on the mock modem")
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the fetched table")
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--cells", type=int, default=200, help="cells written in the commit step")
+    parser.add_argument("--byte-delay", type=float, default=0.0)
+    parser.add_argument("--command-delay", type=float, default=0.0)
+    parser.add_argument("--chunk", type=int, default=0)
+    parser.add_argument("--sessions", type=int, default=1, help="telnet sessions for the read_all step")
+    parser.add_argument("--max-sessions", type=int, default=0, help="session limit of the mock modem")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    server, address = start_server(args)
+    try:
+        results = [run_once(address, args) for _ in range(args.runs)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    rows, cells, parallel = results[0][1:]
+    medians = {key: statistics.median(timings[key] for timings, _, _, _ in results) for key in results[0][0]}
+    for key, value in medians.items():
+        print(f"{key:12s} {value * 1000:9.1f} ms")
+    print(f"{'fetch':12s} {rows / medians['fetch']:9.0f} rows/s ({rows} rows)")
+    print(f"{'read_all':12s} {args.tables + 1:9d} tables over {parallel} session(s)")
+    print(f"{'commit':12s} {cells / medians['commit']:9.0f} cells/s ({cells} cells)")
+
+    return check_baseline(args, medians)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Startup benchmark: import time, main window construction and help dialog.
+
+Each run happens in a fresh interpreter so module import and icon loading
+are measured cold. Usage:
+
+    python benchmarks/bench_startup.py --save baseline.json
+    python benchmarks/bench_startup.py --baseline baseline.json
+
+With --baseline the script exits with status 1 when a median is slower
+than the baseline by more than --tolerance (default 25%).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from baseline import add_baseline_arguments, check_baseline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+timings = {}
+start = time.perf_counter()
+import cli
+timings["import_cli"] = time.perf_counter() - start
+start = time.perf_counter()
+import main
+timings["import_main"] = time.perf_counter() - start
+from PySide6.QtWidgets import QApplication
+app = QApplication([])
+start = time.perf_counter()
+window = main.TelnetClient()
+timings["create_window"] = time.perf_counter() - start
+start = time.perf_counter()
+window.help_box()
+timings["help_first"] = time.perf_counter() - start
+start = time.perf_counter()
+window.help_box()
+timings["help_again"] = time.perf_counter() - start
+window.thread.quit()
+window.thread.wait()
+print(json.dumps(timings))
+"""
+
+
+def run_once():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    output = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    for key, value in medians.items():
+        print(f"{key:15s} {value * 1000:8.1f} ms")
+
+    return check_baseline(args, medians)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
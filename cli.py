@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import sys
+
+from core import TelnetSession, parse_table_list
+from journal import (CommitJournal, commit_journal, list_journals, pending_journals, read_old_values,
+                     rollback_journal)
+from offline import ChangeSet, check_changes
+from snapshot import diff_snapshots, dump_database
+from table_io import diff_table_file, export_table, import_changes
+
+
+def load_changes(file_name):
+    # File perubahan: array JSON atau JSON Lines, tiap item berisi
+    # table, row, column dan value.
+    with open(file_name, 'r') as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        changes = json.loads(text)
+    else:
+        changes = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for change in changes:
+        missing = {"table", "row", "column", "value"} - change.keys()
+        if missing:
+            raise ValueError(f"Change {change} is missing {', '.join(sorted(missing))}")
+    return changes
+
+
+def change_record(change, **extra):
+    table, row, column, old, new = change
+    return dict({"table": table, "row": row, "column": column, "old": old, "value": new}, **extra)
+
+
+def commit_changes(session, changes):
+    # Semua perubahan masuk journal dulu; bila ada yang gagal semuanya
+    # dikembalikan, jadi applied selalu semua atau nol
+    result = commit_journal(session, CommitJournal.create(session.host or "", changes))
+    committed = result["state"] == "committed"
+    output = {"state": result["state"], "journal": result["journal"], "applied": len(changes) if committed else 0,
+              "failed": [change_record(change, error=error) for change, error in result["failed"]]
+              + [change_record(change, error="value not kept after DB save") for change in result["mismatches"]]}
+    if result["error"]:
+        output["interrupted"] = result["error"]
+    if result["state"] == "rollback_failed":
+        output["error"] = result["rollback_error"] or (
+            f"rollback failed for {len(result['rollback_failed']) + len(result['rollback_mismatches'])} cells")
+    return output
+
+
+def apply_changes(session, changes):
+    cells = [(c["table"], c["row"], c["column"], c["value"]) for c in changes]
+    return commit_changes(session, read_old_values(session, cells))
+
+
+def cmd_list_tables(session, args):
+    return parse_table_list(session.command("sendcmd 1 DB all"))
+
+
+def cmd_dump(session, args):
+    data = session.read_table(args.table)
+    return {"table": args.table, "columns": list(data.columns), "rows": data.rows()}
+
+
+def cmd_set(session, args):
+    return apply_changes(session, [{"table": args.table, "row": args.row,
+                                    "column": args.column, "value": args.value}])
+
+
+def cmd_apply(session, args):
+    return apply_changes(session, load_changes(args.file))
+
+
+def cmd_export(session, args):
+    rows = export_table(session, args.table, args.file)
+    return {"table": args.table, "file": args.file, "rows": rows}
+
+
+def cmd_import(session, args):
+    changes, problems = diff_table_file(session.read_table(args.table), args.file)
+    result = dict({"table": args.table, "changes": len(changes)}, **problems)
+    if args.dry_run:
+        result["cells"] = [{"row": row, "column": column, "old": old, "value": value}
+                           for row, column, old, value in changes]
+        return result
+    if changes:
+        result.update(commit_changes(session, import_changes(args.table, changes)))
+    else:
+        result.update(applied=0, failed=[])
+    return result
+
+
+def cmd_journals(session, args):
+    return [{"file": journal.file_name, "host": journal.host, "timestamp": journal.header.get("timestamp"),
+             "tables": journal.tables, "changes": len(journal.changes), "state": journal.state}
+            for journal in list_journals()]
+
+
+def cmd_rollback(session, args):
+    if args.journal:
+        journal = CommitJournal(args.journal)
+    else:
+        pending = pending_journals(args.host)
+        if not pending:
+            raise ValueError(f"No interrupted commit to {args.host}, give the journal file")
+        journal = pending[0]
+    result = rollback_journal(session, journal)
+    restored = len(journal.changes) if result["state"] == "rolled_back" else 0
+    output = {"journal": journal.file_name, "state": result["state"], "restored": restored,
+              "failed": [change_record(change, error=error) for change, error in result["rollback_failed"]]
+              + [change_record(change, error="old value not kept after DB save")
+                 for change in result["rollback_mismatches"]]}
+    if result["rollback_error"]:
+        output["error"] = result["rollback_error"]
+    return output
+
+
+def cmd_push(session, args):
+    # Change set dari mode offline GUI: konflik tetap di file, sisanya
+    # dikirim sebagai satu commit
+    changeset = ChangeSet(args.file)
+    if not len(changeset):
+        raise ValueError(f"No queued changes in {args.file}")
+    ready, conflicts, applied = check_changes(session, changeset.cells())
+    result = {"conflicts": [dict(zip(("table", "row", "column", "base", "current", "value"), conflict))
+                            for conflict in conflicts],
+              "already_applied": len(applied)}
+    if args.dry_run:
+        result["cells"] = [change_record(change) for change in ready]
+        return result
+    changeset.discard(applied)
+    if ready:
+        result.update(commit_changes(session, ready))
+        if result["state"] == "committed":
+            changeset.discard(ready)
+    changeset.save()
+    return result
+
+
+def cmd_snapshot(session, args):
+    progress = (lambda done, total: print(f"{done}/{total}", file=sys.stderr)) if args.verbose else None
+    count = dump_database(session, args.file, tables=args.tables or None, on_progress=progress)
+    return {"file": args.file, "tables": count}
+
+
+def cmd_diff(session, args):
+    return diff_snapshots(args.old, args.new)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="zdbedit", description="ZTE modem database editor (command line)")
+    parser.add_argument("--host", default=os.environ.get("ZDBEDIT_HOST", "192.168.1.1"),
+                        help="modem address, optionally host:port")
+    parser.add_argument("--user", default=os.environ.get("ZDBEDIT_USER", "root"))
+    parser.add_argument("--password", default=os.environ.get("ZDBEDIT_PASSWORD", "Zte521"))
+    parser.add_argument("--timeout", type=float, default=None, help="seconds a command may go without data from the modem")
+    parser.add_argument("--sessions", type=int, default=1,
+                        help="parallel telnet sessions for bulk reads such as snapshot (capped, modem may accept fewer)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list-tables", help="list all database tables").set_defaults(func=cmd_list_tables)
+
+    dump = commands.add_parser("dump", help="print all rows of a table")
+    dump.add_argument("table")
+    dump.set_defaults(func=cmd_dump)
+
+    set_parser = commands.add_parser("set", help="set one cell and save")
+    set_parser.add_argument("table")
+    set_parser.add_argument("row", type=int)
+    set_parser.add_argument("column")
+    set_parser.add_argument("value")
+    set_parser.set_defaults(func=cmd_set)
+
+    apply = commands.add_parser("apply", help="apply changes from a JSON/JSONL file as one verified commit")
+    apply.add_argument("file")
+    apply.set_defaults(func=cmd_apply)
+
+    export = commands.add_parser("export", help="stream a table to a CSV or JSONL file")
+    export.add_argument("table")
+    export.add_argument("file", help="output file, .csv or .jsonl")
+    export.set_defaults(func=cmd_export)
+
+    import_parser = commands.add_parser("import", help="apply only the cells of a CSV/JSONL file that differ from the modem")
+    import_parser.add_argument("table")
+    import_parser.add_argument("file", help="file written by export (the _row column gives the row)")
+    import_parser.add_argument("-n", "--dry-run", action="store_true", help="list the changed cells without applying them")
+    import_parser.set_defaults(func=cmd_import)
+
+    journals = commands.add_parser("journals", help="list commit journals, newest first (no modem needed)")
+    journals.set_defaults(func=cmd_journals, offline=True)
+
+    rollback = commands.add_parser("rollback", help="restore the old values recorded in a commit journal")
+    rollback.add_argument("journal", nargs="?", help="journal file (default: newest interrupted commit to --host)")
+    rollback.set_defaults(func=cmd_rollback)
+
+    push = commands.add_parser("push", help="check a change set prepared offline against the modem and commit it")
+    push.add_argument("file", help="change set written next to the snapshot (SNAPSHOT.changes.json)")
+    push.add_argument("-n", "--dry-run", action="store_true", help="only report conflicts and the cells to push")
+    push.set_defaults(func=cmd_push)
+
+    snapshot = commands.add_parser("snapshot", help="dump all tables into a SQLite file")
+    snapshot.add_argument("file")
+    snapshot.add_argument("--tables", nargs="+", help="only these tables instead of all")
+    snapshot.add_argument("-v", "--verbose", action="store_true", help="print progress to stderr")
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    diff = commands.add_parser("diff", help="compare two snapshot files (no modem needed)")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.set_defaults(func=cmd_diff, offline=True)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    options = {"command_timeout": args.timeout} if args.timeout else {}
+    # Perintah offline (diff, journals) tidak membuat sesi: tanpa asyncio
+    # dan event loop, jadi tetap cepat
+    session = None
+    try:
+        if not getattr(args, "offline", False):
+            session = TelnetSession(**options)
+            session.connect(args.host, args.user, args.password)
+            if args.sessions > 1:
+                session.open_pool(args.sessions)
+        result = args.func(session, args)
+    except Exception as e:
+        json.dump({"error": str(e)}, sys.stdout)
+        sys.stdout.write("\n")
+        return 1
+    finally:
+        if session:
+            session.close()
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if isinstance(result, dict) and (result.get("failed") or result.get("error")) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1643 @@
+import bisect
+import builtins
+import codecs
+import csv
+import functools
+import hashlib
+import heapq
+import html
+import itertools
+import json
+import operator
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+# Penanda akhir respons dari modem: prompt shell di baris terakhir, atau
+# tag penutup XML dari perintah "DB p".
+PROMPT_PATTERN = re.compile(rb"(?:^|\n)([^\n<>]*[#$^] ?)$")
+END_MARKERS = (b"</DB>", b"</Tbl>")
+ERROR_PATTERN = re.compile(r"\b(?:fail(?:ed|ure)?|error|invalid|not found)\b", re.IGNORECASE)
+IDLE_TIMEOUT = 2.0
+MARKER_GRACE = 0.2
+COMMAND_TIMEOUT = 30.0
+COMMAND_MAX_TIME = 600.0
+LOGIN_TIMEOUT = 10.0
+PIPELINE_DEPTH = 8
+KEEPALIVE_INTERVAL = 60.0
+KEEPALIVE_TIMEOUT = 5.0
+KEEPALIVE_RETRY_DELAY = 5.0
+KEEPALIVE_MAX_DELAY = 300.0
+RECONNECT_ATTEMPTS = 2
+POOL_MAX_SESSIONS = 4
+STREAM_BATCH_INTERVAL = 0.05
+STREAM_BATCH_ROWS = 1000
+CACHE_MAX_CELLS = 2_000_000
+FLEET_CONCURRENCY = 16
+FLEET_RETRIES = 2
+FLEET_RETRY_DELAY = 2.0
+PRIORITY_CONTROL, PRIORITY_WRITE, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND = range(4)
+PREFETCH_BUDGET = 50
+WATCH_INTERVAL = 5
+USAGE_FILE = os.path.join(os.path.expanduser("~"), ".zdbedit", "usage.json")
+USAGE_HALF_LIFE = 7 * 24 * 3600
+DEVICE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".zdbedit", "devices")
+DEVICE_KEY_PATTERN = re.compile(r"[^0-9A-Za-z._-]+")
+FUZZY_MIN_RESULTS = 10
+SEARCH_LIMIT = 500
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+IAC_BYTE = bytes((IAC,))
+METRICS_CAPACITY = 5000
+COMMAND_TYPES = ("DB all", "DB p", "DB set", "DB save")
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+METRIC_FIELDS = ("timestamp", "type", "command", "send", "ttfb", "read", "bytes", "parse", "render")
+DEVICE_INFO_COLUMNS = {
+    "serial": ("SerialNumber", "SerialNo", "SN"),
+    "firmware": ("SoftwareVer", "SoftwareVersion", "SWVer", "Version"),
+    "model": ("ModelName", "Model", "ProductClass"),
+}
+
+ROW_PATTERN = re.compile(r'<Row No="(\d+)">(.*?)</Row>', re.DOTALL)
+DM_PATTERN = re.compile(r'<DM name="((?:[^"\\]|\\.)*)" val="((?:[^"\\]|\\.)*)"')
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+SHELL_SPECIAL_PATTERN = re.compile(r'([\\"$`])')
+SET_VALUE_PATTERN = re.compile(r"[\x20-\x7e]*")
+TABLE_LIST_PATTERN = re.compile(r"^\s*\d+\s+(\S+)\s*$", re.MULTILINE)
+
+
+def reply_error(output):
+    # Modem tidak memberi kode status, jadi cari baris pesan kesalahan.
+    # Semua baris echo perintah dilewati: dengan pipelining, echo perintah
+    # berikutnya (yang nilainya bisa memuat "failed") ikut masuk balasan.
+    for line in output.splitlines():
+        line = line.strip()
+        if line and "sendcmd " not in line and ERROR_PATTERN.search(line):
+            return line
+    return None
+
+
+def set_command(table, row, column, value):
+    # Nilai dikirim di dalam "..." lewat shell ash modem: \ " $ dan backtick
+    # di-escape agar tidak diubah atau dijalankan shell. Selain ASCII yang
+    # bisa dicetak (termasuk baris baru) ditolak sebelum apa pun dikirim.
+    if not SET_VALUE_PATTERN.fullmatch(value):
+        raise ValueError(f"Value for {table} row {row} {column} has characters the modem cannot take: {value!r}")
+    value = SHELL_SPECIAL_PATTERN.sub(r"\\\1", value)
+    return f'sendcmd 1 DB set {table} {row} {column} "{value}"'
+
+
+def parse_table_list(output):
+    # Satu tabel per baris "nomor nama"; baris echo perintah dilewati
+    lines = [line for line in output.splitlines() if "sendcmd " not in line]
+    return TABLE_LIST_PATTERN.findall("\n".join(lines))
+
+
+def unescape_value(value):
+    # Nilai bisa berisi \" maupun entitas XML seperti &quot; dan &amp;
+    if "\\" in value:
+        value = ESCAPE_PATTERN.sub(r"\1", value)
+    if "&" in value:
+        value = html.unescape(value)
+    return value
+
+
+class TableParser:
+    # Parser bertahap untuk output "DB p": terima potongan teks apa adanya
+    # dan kembalikan baris yang sudah lengkap. Yang disimpan hanya sisa
+    # teks setelah baris lengkap terakhir, jadi memori sebanding satu baris.
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        buffer = self.buffer + text
+        rows = []
+        end = 0
+        for match in ROW_PATTERN.finditer(buffer):
+            fields = [(unescape_value(name), unescape_value(value))
+                      for name, value in DM_PATTERN.findall(match.group(2))]
+            rows.append((int(match.group(1)), fields))
+            end = match.end()
+        rest = buffer[end:]
+        start = rest.find("<Row")
+        # Tanpa awal baris yang tertunda, cukup simpan ekor pendek untuk
+        # berjaga-jaga bila "<Row" terpotong di batas potongan.
+        self.buffer = rest[start:] if start >= 0 else rest[-8:]
+        return rows
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class TelnetProtocol:
+    # Negosiasi opsi telnet minimal: semua opsi ditolak (DO -> WONT,
+    # WILL -> DONT), subnegosiasi dibuang dan IAC IAC menjadi byte 0xFF.
+    # Urutan IAC yang terpotong di batas potongan disimpan untuk feed()
+    # berikutnya. Data tanpa byte IAC dilewatkan apa adanya.
+    def __init__(self):
+        self.rest = b""
+        self.in_subnegotiation = False
+
+    def feed(self, data):
+        if self.rest:
+            data, self.rest = self.rest + data, b""
+        if not self.in_subnegotiation and IAC_BYTE not in data:
+            return data, b""
+        output = bytearray()
+        replies = bytearray()
+        i = 0
+        while i < len(data):
+            if self.in_subnegotiation:
+                end = data.find(bytes((IAC, SE)), i)
+                if end < 0:
+                    self.rest = data[-1:] if data.endswith(IAC_BYTE) else b""
+                    break
+                self.in_subnegotiation = False
+                i = end + 2
+                continue
+            j = data.find(IAC_BYTE, i)
+            if j < 0:
+                output += data[i:]
+                break
+            output += data[i:j]
+            if j + 1 >= len(data):
+                self.rest = data[j:]
+                break
+            command = data[j + 1]
+            if command == IAC:
+                output.append(IAC)
+                i = j + 2
+            elif command in (DO, DONT, WILL, WONT):
+                if j + 2 >= len(data):
+                    self.rest = data[j:]
+                    break
+                if command == DO:
+                    replies += bytes((IAC, WONT, data[j + 2]))
+                elif command == WILL:
+                    replies += bytes((IAC, DONT, data[j + 2]))
+                i = j + 3
+            elif command == SB:
+                self.in_subnegotiation = True
+                i = j + 2
+            else:
+                i = j + 2
+        return bytes(output), bytes(replies)
+
+
+class AsyncTelnetSession:
+    # Satu sesi telnet ke modem di atas asyncio streams. Tidak bergantung
+    # pada Qt; banyak sesi bisa berjalan bersamaan dalam satu event loop
+    # (mode fleet). Pemakai sinkron memakai TelnetSession di bawah.
+    # asyncio diimpor di dalam fungsi yang memakainya, bukan di atas modul:
+    # impornya sekitar 70 ms, dan CLI serta GUI tidak butuh itu sebelum
+    # koneksi pertama.
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, command_timeout=COMMAND_TIMEOUT,
+                 pipeline_depth=PIPELINE_DEPTH, login_timeout=LOGIN_TIMEOUT, metrics=None,
+                 command_max_time=COMMAND_MAX_TIME):
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.protocol = None
+        self.inbox = bytearray()
+        self.data_ready = None
+        self.eof = False
+        self.stale = False
+        self.host = None
+        self.prompt = None
+        self.pending = bytearray()
+        self.idle_timeout = idle_timeout
+        self.command_timeout = command_timeout
+        self.command_max_time = command_max_time
+        self.pipeline_depth = pipeline_depth
+        self.login_timeout = login_timeout
+        self.metrics = metrics
+        self.last_read = (0.0, 0.0, 0)
+
+    async def connect(self, ip, user, password):
+        import asyncio
+        await self.close()
+        host, _, port = ip.partition(":")
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(host, int(port or 23)), self.login_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No connection to {ip} after {self.login_timeout:.0f} s")
+        self.host = ip
+        self.enable_tcp_keepalive()
+        self.protocol = TelnetProtocol()
+        self.inbox = bytearray()
+        self.pending = bytearray()
+        self.data_ready = asyncio.Event()
+        self.eof = False
+        self.stale = False
+        self.reader_task = asyncio.ensure_future(self.read_loop())
+
+        deadline = time.monotonic() + self.login_timeout
+        await self.read_until(b"Login: ", deadline, "No login prompt from modem")
+        self.write(user)
+        await self.read_until(b"Password: ", deadline, "No password prompt from modem")
+        self.write(password)
+        response = await self.read_login_reply(deadline)
+        if "incorrect" in response.lower():
+            raise ConnectionError("Login failed")
+
+        # Simpan prompt persis agar balasan yang dipipeline bisa dipisah
+        match = PROMPT_PATTERN.search(response.encode('ascii', errors='replace'))
+        self.prompt = match.group(1) if match else None
+        self.pending = bytearray()
+
+    def enable_tcp_keepalive(self):
+        # Soket mati (modem reboot, kabel dicabut) terdeteksi oleh kernel
+        # walau sesi sedang diam
+        sock = self.writer.get_extra_info("socket")
+        if sock is None:
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+    async def read_until(self, marker, deadline, error):
+        while marker not in self.pending:
+            chunk = await self.receive(deadline - time.monotonic())
+            if not chunk and time.monotonic() >= deadline:
+                raise TimeoutError(error)
+            self.pending += chunk
+        end = self.pending.find(marker) + len(marker)
+        del self.pending[:end]
+
+    async def read_login_reply(self, deadline):
+        # Tunggu prompt shell atau "Login incorrect", lalu beri jeda singkat
+        # agar sisa banner tidak terbawa ke balasan perintah pertama
+        buffer = self.pending
+        while True:
+            if b"incorrect" in buffer.lower():
+                break
+            if PROMPT_PATTERN.search(buffer[-256:]):
+                chunk = await self.receive(MARKER_GRACE)
+                if not chunk:
+                    break
+            else:
+                chunk = await self.receive(deadline - time.monotonic())
+                if not chunk and time.monotonic() >= deadline:
+                    break
+            buffer += chunk
+        return buffer.decode('ascii', errors='replace')
+
+    async def read_loop(self):
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                data, replies = self.protocol.feed(data)
+                if replies:
+                    self.writer.write(replies)
+                if data:
+                    self.inbox += data
+                    self.data_ready.set()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.eof = True
+            if self.data_ready:
+                self.data_ready.set()
+
+    async def receive(self, timeout):
+        # Ambil semua byte yang sudah diterima; tunggu paling lama timeout
+        # bila belum ada. Hasil kosong berarti timeout.
+        import asyncio
+        if not self.inbox:
+            if self.eof:
+                raise ConnectionError("Connection closed by modem")
+            self.data_ready.clear()
+            try:
+                await asyncio.wait_for(self.data_ready.wait(), max(0.0, timeout))
+            except asyncio.TimeoutError:
+                return b""
+            if not self.inbox:
+                if self.eof:
+                    raise ConnectionError("Connection closed by modem")
+                return b""
+        chunk = bytes(self.inbox)
+        self.inbox.clear()
+        return chunk
+
+    def write(self, text):
+        self.writer.write(text.encode('ascii').replace(IAC_BYTE, IAC_BYTE * 2) + b"\n")
+
+    async def send(self, command):
+        start = time.perf_counter()
+        self.write(command)
+        await self.writer.drain()
+        return time.perf_counter() - start
+
+    async def command(self, command):
+        self.check_connected()
+        await self.drain()
+        send = await self.send(command)
+        output = await self.read_response()
+        self.record(command, send)
+        return output.decode('ascii', errors='replace')
+
+    async def keep_alive(self):
+        # Baris kosong cukup untuk dibalas prompt: memastikan shell masih
+        # hidup tanpa membebani modem, dan tidak dicatat di metrik
+        self.check_connected()
+        await self.drain()
+        await self.send("")
+        await self.read_response(idle_timeout=KEEPALIVE_TIMEOUT, timeout=KEEPALIVE_TIMEOUT)
+
+    def record(self, command, send, parse=0.0, callback=0.0):
+        # Catat waktu satu perintah dari hasil read_response terakhir; waktu
+        # di dalam sink (parse dan callback) tidak dihitung sebagai read
+        if self.metrics is not None:
+            ttfb, read, size = self.last_read
+            self.metrics.record(command, send=send, ttfb=ttfb, read=max(0.0, read - callback),
+                                bytes=size, parse=parse)
+
+    async def stream_table(self, table, on_rows):
+        # "DB p" yang di-stream: baris diteruskan ke on_rows per kelompok
+        # kecil selagi output masih mengalir, tanpa menampung seluruh output.
+        self.check_connected()
+        await self.drain()
+        command = f"sendcmd 1 DB p {table}"
+        await self.read_table_reply(on_rows, command, await self.send(command))
+
+    async def read_table_reply(self, on_rows, command=None, send=0.0):
+        parser = TableParser()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        batch = []
+        last_emit = 0.0
+        parse = 0.0
+        callback = 0.0
+
+        def sink(data):
+            nonlocal last_emit, parse, callback
+            start = time.perf_counter()
+            batch.extend(parser.feed(decoder.decode(data)))
+            now = time.perf_counter()
+            parse += now - start
+            if batch and (now - last_emit >= STREAM_BATCH_INTERVAL or len(batch) >= STREAM_BATCH_ROWS):
+                on_rows(batch[:])
+                batch.clear()
+                last_emit = now
+            callback += time.perf_counter() - start
+
+        await self.read_response(sink=sink)
+        start = time.perf_counter()
+        batch.extend(parser.feed(decoder.decode(b"", final=True)))
+        parse += time.perf_counter() - start
+        if command:
+            self.record(command, send, parse, callback)
+        if batch:
+            on_rows(batch)
+
+    async def poll_table(self, table, digest=None):
+        # "DB p" untuk mode pantau: output mentah di-hash sambil diterima dan
+        # baru di-parse bila hash-nya berbeda dari poll sebelumnya. Hasilnya
+        # (hash, TableData), dengan data None bila tabel tidak berubah.
+        self.check_connected()
+        await self.drain()
+        command = f"sendcmd 1 DB p {table}"
+        send = await self.send(command)
+        hasher = hashlib.blake2b(digest_size=16)
+        chunks = []
+
+        def sink(data):
+            hasher.update(data)
+            chunks.append(data)
+
+        await self.read_response(sink=sink)
+        if hasher.hexdigest() == digest:
+            self.record(command, send)
+            return digest, None
+        start = time.perf_counter()
+        data = TableData()
+        data.extend(TableParser().feed(b"".join(chunks).decode('utf-8', errors='replace')))
+        self.record(command, send, time.perf_counter() - start)
+        return hasher.hexdigest(), data
+
+    async def read_table(self, table):
+        data = TableData()
+        await self.stream_table(table, data.extend)
+        return data
+
+    async def read_tables(self, tables, on_table):
+        # Beberapa "DB p" dipipeline seperti set_batch; on_table(nama, data)
+        # dipanggil begitu satu tabel selesai.
+        self.check_connected()
+        await self.drain()
+        depth = self.pipeline_depth if self.prompt else 1
+        sends = []
+        for done, table in enumerate(tables):
+            while len(sends) < len(tables) and len(sends) - done < depth:
+                sends.append(await self.send(f"sendcmd 1 DB p {tables[len(sends)]}"))
+            data = TableData()
+            await self.read_table_reply(data.extend, f"sendcmd 1 DB p {table}", sends[done])
+            on_table(table, data)
+
+    async def set_batch(self, commands, on_progress=None, on_error=None, start=0):
+        # Kirim banyak "DB set" sekaligus (paling banyak pipeline_depth yang
+        # belum dibalas), periksa tiap balasan, lalu satu "DB save" di akhir.
+        # Hasilnya jumlah perintah yang gagal. start melewati perintah yang
+        # sudah dibalas sebelum koneksi putus.
+        self.check_connected()
+        await self.drain()
+        depth = self.pipeline_depth if self.prompt else 1
+        failed = 0
+        sends = {}
+        sent = start
+        for done in range(start, len(commands)):
+            command = commands[done]
+            while sent < len(commands) and sent - done < depth:
+                sends[sent] = await self.send(commands[sent])
+                sent += 1
+            output = (await self.read_response()).decode('ascii', errors='replace')
+            self.record(command, sends.pop(done))
+            error = reply_error(output)
+            if error:
+                failed += 1
+                if on_error:
+                    on_error(done, error)
+            if on_progress:
+                on_progress(done + 1)
+
+        command = "sendcmd 1 DB save"
+        send = await self.send(command)
+        output = (await self.read_response()).decode('ascii', errors='replace')
+        self.record(command, send)
+        error = reply_error(output)
+        if error:
+            raise RuntimeError(error)
+        if on_progress:
+            on_progress(len(commands) + 1)
+        return failed
+
+    def check_connected(self):
+        if not self.writer:
+            raise ConnectionError("Not connected to modem")
+
+    async def drain(self):
+        # Buang sisa output perintah sebelumnya (mis. prompt setelah </DB>).
+        # Setelah operasi dibatalkan, tunggu sampai modem selesai mengirim
+        # sisa balasannya.
+        self.pending = bytearray()
+        if self.stale:
+            while await self.receive(MARKER_GRACE):
+                pass
+            self.stale = False
+        self.inbox.clear()
+
+    async def read_response(self, idle_timeout=None, timeout=None, sink=None):
+        # Baca satu balasan sampai prompt muncul. Selama prompt belum
+        # dikenal, berhenti juga setelah tag penutup XML atau bila modem diam
+        # selama idle_timeout. Setelah prompt dikenal, jeda tidak mengakhiri
+        # balasan (DB save atau DB p besar bisa diam lama): tunggu prompt
+        # selama modem tidak diam lebih dari timeout. Batas waktu itu mundur
+        # tiap ada data masuk, sampai total command_max_time. Byte setelah
+        # prompt disimpan untuk balasan berikutnya. Dengan sink, data
+        # diteruskan sambil jalan dan hasilnya kosong.
+        idle_timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        timeout = self.command_timeout if timeout is None else timeout
+        buffer = self.pending
+        self.pending = bytearray()
+        marker_seen = False
+        scanned = 0
+        sent = 0
+        started = time.perf_counter()
+        first_byte = started if buffer else None
+        received = len(buffer)
+        limit = time.monotonic() + max(timeout, self.command_max_time)
+        deadline = min(time.monotonic() + timeout, limit)
+
+        while True:
+            start = max(0, scanned - 16)
+            if not marker_seen and any(marker in buffer[start:] for marker in END_MARKERS):
+                marker_seen = True
+            end = -1
+            if self.prompt:
+                end = buffer.find(self.prompt, max(0, scanned - len(self.prompt)))
+                if end >= 0:
+                    end += len(self.prompt)
+            elif buffer and PROMPT_PATTERN.search(buffer[-256:]):
+                end = len(buffer)
+            if end >= 0:
+                self.pending = buffer[end:]
+                self.finish_read(started, first_byte, received - len(self.pending))
+                return self.deliver(buffer[sent:end], sink)
+            if sink and len(buffer) > sent:
+                # Teruskan semua, tapi sisakan ekor untuk mencari prompt
+                # dan penanda yang terpotong di batas potongan
+                sink(bytes(buffer[sent:]))
+                del buffer[:-256]
+                sent = len(buffer)
+            scanned = len(buffer)
+
+            now = time.monotonic()
+            if now >= limit:
+                raise TimeoutError(f"No complete response after {self.command_max_time:.0f} s")
+            if now >= deadline:
+                raise TimeoutError(f"No data from modem for {timeout:.0f} s")
+            if self.prompt:
+                wait = deadline - now
+            elif marker_seen:
+                wait = MARKER_GRACE
+            elif buffer:
+                wait = idle_timeout
+            else:
+                wait = deadline - now
+            wait = min(wait, deadline - now)
+
+            chunk = await self.receive(wait)
+            if not chunk:
+                if buffer and not self.prompt:
+                    self.finish_read(started, first_byte, received)
+                    return self.deliver(buffer[sent:], sink)
+                continue
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            received += len(chunk)
+            buffer += chunk
+            deadline = min(time.monotonic() + timeout, limit)
+
+    def finish_read(self, started, first_byte, size):
+        now = time.perf_counter()
+        self.last_read = ((first_byte or now) - started, now - started, size)
+
+    def deliver(self, data, sink):
+        if sink is None:
+            return bytes(data)
+        if data:
+            sink(bytes(data))
+        return b""
+
+    async def close(self):
+        if self.reader_task:
+            self.reader_task.cancel()
+            self.reader_task = None
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.writer = None
+            self.reader = None
+
+
+class TelnetSession:
+    # Pembungkus sinkron AsyncTelnetSession untuk Worker, CLI dan snapshot.
+    # Tiap sesi punya event loop sendiri yang dijalankan di thread pemanggil,
+    # jadi callback tetap dipanggil di thread itu. cancel() boleh dipanggil
+    # dari thread lain (mis. GUI) untuk membatalkan operasi yang berjalan.
+    # Bila koneksi putus, sesi login ulang dengan kredensial terakhir lalu
+    # mengulang operasi baca, atau melanjutkan batch dari perintah yang
+    # belum dibalas (DB set aman diulang).
+    # open_pool() membuka sesi tambahan ke modem yang sama; read_tables
+    # membagi tabel ke semua sesi, sedangkan tulis tetap lewat sesi utama
+    # agar urutan DB set/DB save terjaga.
+    def __init__(self, reconnect_attempts=RECONNECT_ATTEMPTS, on_reconnect=None, **options):
+        import asyncio
+        self.options = options
+        self.session = AsyncTelnetSession(**options)
+        self.pool = []
+        self.pool_target = 1
+        self.loop = asyncio.new_event_loop()
+        self.task = None
+        self.owner = None
+        self.lock = threading.Lock()
+        self.credentials = None
+        self.reconnect_attempts = reconnect_attempts
+        self.on_reconnect = on_reconnect
+
+    @property
+    def host(self):
+        return self.session.host
+
+    @property
+    def prompt(self):
+        return self.session.prompt
+
+    @property
+    def metrics(self):
+        return self.session.metrics
+
+    @property
+    def parallelism(self):
+        return 1 + len(self.pool)
+
+    def run(self, operation, timeout=None):
+        import asyncio
+        if timeout:
+            operation = asyncio.wait_for(operation, timeout)
+        task = self.loop.create_task(operation)
+        with self.lock:
+            self.task = task
+        try:
+            return self.loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            self.session.stale = True
+            raise OperationCancelled("Operation cancelled")
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            # Balasan yang terpotong harus dibuang sebelum perintah berikutnya
+            self.session.stale = True
+            raise TimeoutError(str(e) or f"Operation timed out after {timeout:g} s")
+        finally:
+            with self.lock:
+                self.task = None
+
+    def cancel(self, owner=None):
+        # owner adalah pemilik operasi yang diminta batal (mis. permintaan
+        # scheduler). Bila operasi itu sudah selesai dan sesi sedang dipakai
+        # pemilik lain, tidak ada yang dibatalkan.
+        with self.lock:
+            if self.task is not None and (owner is None or owner is self.owner):
+                self.loop.call_soon_threadsafe(self.task.cancel)
+
+    def run_retrying(self, operation, timeout=None, on_retry=None, progress=lambda: 0):
+        # operation() membuat coroutine baru untuk tiap percobaan. Jatah
+        # percobaan dihitung ulang selama progress() masih bertambah.
+        attempts = 0
+        last = progress()
+        while True:
+            try:
+                return self.run(operation(), timeout)
+            except ConnectionError:
+                if progress() > last:
+                    attempts = 0
+                    last = progress()
+                if attempts >= self.reconnect_attempts or not self.credentials:
+                    raise
+            attempts += 1
+            self.reconnect()
+            if on_retry:
+                on_retry()
+
+    def reconnect(self):
+        # Login yang gagal di tengah jalan ditutup, jadi sesi kembali ke
+        # keadaan "tidak tersambung" yang bisa dicoba lagi nanti
+        try:
+            self.run(self.session.connect(*self.credentials), self.session.login_timeout)
+        except Exception:
+            self.run(self.session.close())
+            raise
+        if self.on_reconnect:
+            self.on_reconnect()
+
+    def connect(self, ip, user, password, timeout=None):
+        self.credentials = None
+        self.run(self.session.connect(ip, user, password), timeout)
+        self.credentials = (ip, user, password)
+
+    def open_pool(self, size):
+        # Jumlah sesi dibatasi POOL_MAX_SESSIONS dan login yang ditolak
+        # firmware; hasilnya jumlah sesi yang benar-benar terbuka
+        self.pool_target = max(1, min(size, POOL_MAX_SESSIONS))
+        self.run(self.fill_pool(), self.session.login_timeout)
+        return self.parallelism
+
+    async def fill_pool(self):
+        import asyncio
+        missing = self.pool_target - self.parallelism
+        if missing <= 0 or not self.credentials:
+            return
+        sessions = [AsyncTelnetSession(**self.options) for _ in range(missing)]
+        results = await asyncio.gather(*(session.connect(*self.credentials) for session in sessions),
+                                       return_exceptions=True)
+        for session, result in zip(sessions, results):
+            if isinstance(result, Exception):
+                await session.close()
+            else:
+                self.pool.append(session)
+        if self.parallelism < self.pool_target:
+            # Firmware menolak login tambahan: itulah batas modem ini
+            self.pool_target = self.parallelism
+
+    async def close_pool(self):
+        pool, self.pool = self.pool, []
+        for session in pool:
+            await session.close()
+
+    def keep_alive(self):
+        # Hasilnya True bila sesi harus disambung ulang dan berhasil. Sesi
+        # yang sudah putus (mis. sambung ulang sebelumnya gagal karena modem
+        # masih reboot) langsung dicoba disambung lagi.
+        try:
+            self.run(self.session.keep_alive())
+            return False
+        except (ConnectionError, TimeoutError):
+            if not self.credentials:
+                raise
+        self.reconnect()
+        return True
+
+    def command(self, command, timeout=None):
+        return self.run_retrying(lambda: self.session.command(command), timeout)
+
+    def stream_table(self, table, on_rows, timeout=None, on_retry=None):
+        # on_retry dipanggil sebelum tabel di-stream ulang dari awal
+        self.run_retrying(lambda: self.session.stream_table(table, on_rows), timeout, on_retry)
+
+    def read_table(self, table, timeout=None):
+        return self.run_retrying(lambda: self.session.read_table(table), timeout)
+
+    def poll_table(self, table, digest=None, timeout=None):
+        return self.run_retrying(lambda: self.session.poll_table(table, digest), timeout)
+
+    def read_tables(self, tables, on_table, timeout=None):
+        done = set()
+
+        def deliver(name, data):
+            done.add(name)
+            on_table(name, data)
+
+        self.run_retrying(lambda: self.read_pooled([t for t in tables if t not in done], deliver),
+                          timeout, progress=lambda: len(done))
+
+    async def read_pooled(self, tables, on_table):
+        # Tanpa pool: "DB p" dipipeline di satu sesi. Dengan pool tiap sesi
+        # mengambil tabel berikutnya dari antrian bersama begitu selesai.
+        import asyncio
+        await self.fill_pool()
+        if not self.pool:
+            return await self.session.read_tables(tables, on_table)
+        queue = deque(tables)
+
+        async def work(session):
+            while queue:
+                table = queue.popleft()
+                try:
+                    data = await session.read_table(table)
+                except asyncio.CancelledError:
+                    session.stale = True
+                    raise
+                except (ConnectionError, TimeoutError, OSError):
+                    queue.appendleft(table)
+                    if session is self.session:
+                        raise
+                    # Sesi tambahan yang putus dilepas, tabelnya diambil
+                    # sesi lain; pool diisi lagi pada baca massal berikutnya
+                    self.pool.remove(session)
+                    await session.close()
+                    return
+                on_table(table, data)
+
+        tasks = [asyncio.ensure_future(work(session)) for session in [self.session] + self.pool]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def set_batch(self, commands, on_progress=None, on_error=None, timeout=None):
+        confirmed = 0
+        failed = 0
+
+        def progress(done):
+            nonlocal confirmed
+            confirmed = min(done, len(commands))
+            if on_progress:
+                on_progress(done)
+
+        def error(index, message):
+            nonlocal failed
+            failed += 1
+            if on_error:
+                on_error(index, message)
+
+        self.run_retrying(lambda: self.session.set_batch(commands, progress, error, confirmed), timeout,
+                          progress=lambda: confirmed)
+        return failed
+
+    def check_connected(self):
+        # Dengan kredensial tersimpan, sesi yang putus disambung ulang oleh
+        # operasi berikutnya lewat run_retrying
+        if not self.credentials:
+            self.session.check_connected()
+
+    def close(self):
+        self.credentials = None
+        if not self.loop.is_closed():
+            self.run(self.close_pool())
+            self.run(self.session.close())
+
+
+class ScheduledRequest:
+    __slots__ = ("id", "kind", "args", "priority", "key", "group", "sequence", "superseded",
+                 "preemptible", "preempted")
+
+    def __init__(self, request_id, kind, args, priority, key, group, sequence, preemptible=False):
+        self.id = request_id
+        self.kind = kind
+        self.args = args
+        self.priority = priority
+        self.key = key
+        self.group = group
+        self.sequence = sequence
+        self.superseded = False
+        self.preemptible = preemptible
+        self.preempted = False
+
+
+class CommandScheduler:
+    # Antrian prioritas perintah untuk satu sesi. Angka prioritas kecil
+    # didahulukan; prioritas sama dijalankan sesuai urutan masuk, jadi
+    # commit (PRIORITY_WRITE, tanpa key) tidak pernah bertukar urutan.
+    # - key: permintaan baca dengan kind dan key sama yang masih antre atau
+    #   sedang jalan digabung, id lama dikembalikan.
+    # - group: permintaan baru menggantikan anggota group lain yang masih
+    #   antre, dan yang sedang jalan dibatalkan lewat on_cancel(permintaan).
+    # - preemptible: permintaan yang sedang jalan dibatalkan begitu ada
+    #   permintaan berprioritas lebih tinggi, lalu dimasukkan lagi lewat
+    #   requeue() oleh worker.
+    # Dipanggil dari thread GUI (submit/cancel) dan thread worker
+    # (next/done), jadi semua akses lewat lock.
+    def __init__(self, on_cancel=None):
+        self.on_cancel = on_cancel
+        self.heap = []
+        self.queued = {}
+        self.running = None
+        self.ids = itertools.count(1)
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+    def submit(self, kind, args=(), priority=PRIORITY_INTERACTIVE, key=None, group=None,
+               preemptible=False):
+        # Hasilnya (id, baru); baru False berarti digabung ke permintaan lama
+        cancel_running = False
+        with self.lock:
+            running = self.running
+            if running and running.preemptible and priority < running.priority and not running.preempted:
+                running.preempted = True
+                cancel_running = True
+            if group is not None:
+                for request in list(self.queued.values()):
+                    if request.group == group and request.key != key:
+                        request.superseded = True
+                        del self.queued[request.id]
+                if running and running.group == group and running.key != key and not running.superseded:
+                    running.superseded = True
+                    cancel_running = True
+            existing = self.find(kind, key) if key is not None else None
+            if existing is not None:
+                if existing is not self.running and priority < existing.priority:
+                    existing.priority = priority
+                    heapq.heappush(self.heap, (priority, existing.sequence, existing))
+                result = (existing.id, False)
+            else:
+                request = ScheduledRequest(next(self.ids), kind, tuple(args), priority, key, group,
+                                           next(self.sequence), preemptible)
+                self.queued[request.id] = request
+                heapq.heappush(self.heap, (priority, request.sequence, request))
+                result = (request.id, True)
+        if cancel_running and self.on_cancel:
+            self.on_cancel(running)
+        return result
+
+    def find(self, kind, key):
+        for request in itertools.chain(self.queued.values(), [self.running]):
+            if request and not request.superseded and request.kind == kind and request.key == key:
+                return request
+        return None
+
+    def next(self):
+        with self.lock:
+            while self.heap:
+                priority, _, request = heapq.heappop(self.heap)
+                # Entri lama (prioritas sudah dinaikkan atau dibatalkan) dilewati
+                if self.queued.get(request.id) is request and request.priority == priority:
+                    del self.queued[request.id]
+                    self.running = request
+                    return request
+            return None
+
+    def requeue(self, request):
+        # Permintaan yang didahului kembali ke antrian dengan urutan lamanya
+        with self.lock:
+            request.preempted = False
+            self.queued[request.id] = request
+            heapq.heappush(self.heap, (request.priority, request.sequence, request))
+
+    def done(self, request):
+        with self.lock:
+            if self.running is request:
+                self.running = None
+
+    def cancel(self, request_id):
+        cancel_running = False
+        with self.lock:
+            running = self.running
+            if self.queued.pop(request_id, None) is None and running and running.id == request_id:
+                running.superseded = True
+                cancel_running = True
+        if cancel_running and self.on_cancel:
+            self.on_cancel(running)
+
+    def clear(self, below=PRIORITY_CONTROL):
+        # Buang semua permintaan antre dengan prioritas lebih rendah dari below
+        with self.lock:
+            for request in list(self.queued.values()):
+                if request.priority > below:
+                    del self.queued[request.id]
+
+    def pending(self):
+        with self.lock:
+            return len(self.queued)
+
+    def idle(self):
+        with self.lock:
+            return not self.queued and self.running is None
+
+
+class TableNameIndex:
+    # Indeks nama tabel untuk pencarian: nama huruf kecil dan trigram ke
+    # posisi nama, dibangun sekali tiap daftar tabel berubah.
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.lower = [name.lower() for name in self.names]
+        self.trigrams = {}
+        for position, name in enumerate(self.lower):
+            for i in range(len(name) - 2):
+                self.trigrams.setdefault(name[i:i + 3], set()).add(position)
+
+    def candidates(self, query):
+        if len(query) < 3:
+            return range(len(self.lower))
+        sets = []
+        for i in range(len(query) - 2):
+            positions = self.trigrams.get(query[i:i + 3])
+            if not positions:
+                return ()
+            sets.append(positions)
+        sets.sort(key=len)
+        return sorted(set.intersection(*sets))
+
+    def search(self, query, fuzzy=True):
+        # Hasil berupa posisi nama: cocok persis, lalu awalan, lalu substring
+        # (makin depan makin baik), lalu huruf berurutan (fuzzy) paling rapat.
+        query = query.strip().lower()
+        if not query:
+            return list(range(len(self.names)))
+        ranked = []
+        matched = set()
+        for position in self.candidates(query):
+            found = self.lower[position].find(query)
+            if found >= 0:
+                kind = 0 if self.lower[position] == query else 1 if found == 0 else 2
+                ranked.append((kind, found, len(self.lower[position]), position))
+                matched.add(position)
+        # Fuzzy hanya sebagai cadangan bila hasil substring sedikit, agar
+        # daftar tidak dipenuhi nama yang kebetulan memuat huruf-hurufnya
+        if fuzzy and len(query) > 1 and len(ranked) < FUZZY_MIN_RESULTS:
+            pattern = re.compile(".*?".join(map(re.escape, query)))
+            for position, name in enumerate(self.lower):
+                if position not in matched:
+                    match = pattern.search(name)
+                    if match:
+                        ranked.append((3, match.end() - match.start(), len(name), position))
+        ranked.sort()
+        return [item[-1] for item in ranked]
+
+
+class ValueIndex:
+    # Indeks terbalik isi tabel: token nilai -> {(tabel, baris, kolom)}.
+    # Data tabel ikut disimpan untuk memastikan hasil dan lompat ke sel.
+    def __init__(self):
+        self.postings = {}
+        self.tables = {}
+        self.sorted_tokens = None
+
+    @staticmethod
+    def tokens(value):
+        value = value.lower()
+        tokens = set(TOKEN_PATTERN.findall(value))
+        if value.strip():
+            tokens.add(value.strip())
+        return tokens
+
+    def add(self, token, key):
+        keys = self.postings.get(token)
+        if keys is None:
+            keys = self.postings[token] = set()
+            self.sorted_tokens = None
+        keys.add(key)
+
+    def discard(self, token, key):
+        keys = self.postings.get(token)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.postings[token]
+                self.sorted_tokens = None
+
+    def prefixed(self, prefix):
+        # Token berawalan prefix lewat bisect pada daftar token terurut,
+        # yang hanya diurutkan ulang setelah ada token baru/hilang
+        if self.sorted_tokens is None:
+            self.sorted_tokens = sorted(self.postings)
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        end = bisect.bisect_left(self.sorted_tokens, prefix + "\uffff", start)
+        return self.sorted_tokens[start:end]
+
+    def index_table(self, name, data):
+        self.remove_table(name)
+        self.tables[name] = data
+        for column in data.columns:
+            for row, value in enumerate(data.values[column]):
+                if value:
+                    key = (name, row, column)
+                    for token in self.tokens(value):
+                        self.add(token, key)
+
+    def remove_table(self, name):
+        data = self.tables.pop(name, None)
+        if data is None:
+            return
+        for column in data.columns:
+            for row, value in enumerate(data.values[column]):
+                if value:
+                    for token in self.tokens(value):
+                        self.discard(token, (name, row, column))
+
+    def update_cell(self, name, row, column, old, new):
+        if name not in self.tables:
+            return
+        key = (name, row, column)
+        for token in self.tokens(old):
+            self.discard(token, key)
+        for token in self.tokens(new):
+            self.add(token, key)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        # Semua token harus ada; token terakhir boleh berupa awalan karena
+        # biasanya masih diketik. Hasil akhir dicek dengan substring.
+        query = query.strip().lower()
+        words = TOKEN_PATTERN.findall(query)
+        if not words:
+            words = [query] if query else []
+        if not words:
+            return []
+        candidates = None
+        for i, word in enumerate(words):
+            if i == len(words) - 1:
+                keys = set()
+                for token in self.prefixed(word):
+                    keys |= self.postings[token]
+            else:
+                keys = self.postings.get(word, set())
+            candidates = keys if candidates is None else candidates & keys
+            if not candidates:
+                return []
+        results = []
+        for name, row, column in sorted(candidates):
+            value = self.tables[name].value(row, column)
+            if query in value.lower():
+                results.append((name, row, column, value))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def device_info(session):
+    # Identitas perangkat dari tabel DevInfo. Nama kolom berbeda antar
+    # firmware, jadi coba beberapa nama yang umum dipakai.
+    try:
+        data = session.read_table("DevInfo")
+    except Exception:
+        return {}
+    info = {}
+    for key, names in DEVICE_INFO_COLUMNS.items():
+        for name in names:
+            if name in data.values and data.row_count:
+                info[key] = data.value(0, name)
+                break
+    return info
+
+
+def device_key(info):
+    # Kunci cache disk: nomor seri plus versi firmware, karena skema tabel
+    # bisa berubah setelah upgrade. Tanpa nomor seri tidak ada cache.
+    if not info.get("serial"):
+        return None
+    key = f"{info['serial']}_{info.get('firmware', '')}"
+    return DEVICE_KEY_PATTERN.sub("_", key).strip("._")
+
+
+def load_fleet_targets(file_name, default_user="root", default_password="Zte521"):
+    # Satu modem per baris: ip,username,password. Username dan password
+    # boleh kosong, baris kosong dan komentar (#) dilewati.
+    targets = []
+    with open(file_name, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            row = [field.strip() for field in row] + ["", ""]
+            targets.append((row[0], row[1] or default_user, row[2] or default_password))
+    return targets
+
+
+def fleet_read_table(table):
+    async def job(session):
+        data = await session.read_table(table)
+        return {"columns": list(data.columns), "rows": data.rows()}
+    return job
+
+
+def fleet_set_value(table, row, column, value):
+    async def job(session):
+        command = set_command(table, row, column, value)
+        errors = []
+        await session.set_batch([command], on_error=lambda _, error: errors.append(error))
+        if errors:
+            raise RuntimeError(errors[0])
+        return "saved"
+    return job
+
+
+def fleet_command(command):
+    async def job(session):
+        return await session.command(command)
+    return job
+
+
+async def run_fleet_target(target, job, retries=FLEET_RETRIES, retry_delay=FLEET_RETRY_DELAY,
+                           cancelled=lambda: False, **session_options):
+    import asyncio
+    ip, user, password = target
+    result = {"ip": ip, "status": "failed", "attempts": 0}
+    try:
+        for attempt in range(retries + 1):
+            if cancelled():
+                result["status"] = "cancelled"
+                break
+            if attempt:
+                await asyncio.sleep(retry_delay)
+            session = AsyncTelnetSession(**session_options)
+            result["attempts"] = attempt + 1
+            try:
+                await session.connect(ip, user, password)
+                result["result"] = await job(session)
+                result["status"] = "ok"
+                result.pop("error", None)
+                break
+            except Exception as e:
+                result["error"] = str(e)
+            finally:
+                await session.close()
+    except asyncio.CancelledError:
+        result["status"] = "cancelled"
+    return result
+
+
+def run_fleet(targets, job, concurrency=FLEET_CONCURRENCY, on_status=None,
+              on_result=None, cancelled=lambda: False, **options):
+    # Jalankan job di semua modem dengan paling banyak `concurrency` sesi
+    # sekaligus, semuanya dalam satu event loop di thread pemanggil. Hasil
+    # dikembalikan sesuai urutan target.
+    import asyncio
+    return asyncio.run(run_fleet_async(targets, job, concurrency, on_status, on_result,
+                                       cancelled, **options))
+
+
+async def run_fleet_async(targets, job, concurrency=FLEET_CONCURRENCY, on_status=None,
+                          on_result=None, cancelled=lambda: False, **options):
+    import asyncio
+    results = [None] * len(targets)
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index):
+        try:
+            async with limit:
+                if on_status:
+                    on_status(index, "running")
+                results[index] = await run_fleet_target(targets[index], job, cancelled=cancelled, **options)
+        except asyncio.CancelledError:
+            results[index] = {"ip": targets[index][0], "status": "cancelled", "attempts": 0}
+        if on_result:
+            on_result(index, results[index])
+
+    tasks = [asyncio.ensure_future(run(index)) for index in range(len(targets))]
+    pending = set(tasks)
+    while pending:
+        # Periksa pembatalan secara berkala; sesi yang sedang berjalan
+        # langsung dihentikan, tidak menunggu perintahnya selesai
+        _, pending = await asyncio.wait(pending, timeout=0.1)
+        if pending and cancelled():
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+            break
+    return results
+
+
+class TableData:
+    # Data tabel disimpan per kolom (satu list per kolom) agar ribuan baris
+    # tidak menjadi ribuan dict. Nama kolom di-intern karena berulang terus.
+    # columns berisi kolom yang sudah diketahui dari cache skema, supaya
+    # header tampil sebelum baris pertama datang; kolom yang ternyata tidak
+    # ada di data dibuang lewat prune_columns().
+    __slots__ = ("columns", "values", "row_count", "unconfirmed")
+
+    def __init__(self, columns=()):
+        self.columns = sorted({sys.intern(name) for name in columns})
+        self.values = {name: [] for name in self.columns}
+        self.row_count = 0
+        self.unconfirmed = set(self.columns)
+
+    def add_column(self, name):
+        # Kolom selalu terurut menurut nama, juga saat ditambah di tengah stream
+        name = sys.intern(name)
+        if name not in self.values:
+            bisect.insort(self.columns, name)
+            self.values[name] = [""] * self.row_count
+        return name
+
+    def remove_column(self, name):
+        self.columns.remove(name)
+        del self.values[name]
+        self.unconfirmed.discard(name)
+
+    def prune_columns(self):
+        for name in list(self.unconfirmed):
+            self.remove_column(name)
+
+    def append_row(self, fields):
+        if self.unconfirmed:
+            self.unconfirmed.difference_update(name for name, _ in fields)
+        row = self.row_count
+        for name, value in fields:
+            column = self.values.get(name)
+            if column is None:
+                column = self.values[self.add_column(name)]
+            if len(column) > row:
+                column[row] = value
+            else:
+                column.append(value)
+        self.row_count += 1
+        # Kolom yang tidak ada di baris ini diisi string kosong
+        for column in self.values.values():
+            if len(column) < self.row_count:
+                column.append("")
+
+    def extend(self, rows):
+        for _, fields in rows:
+            self.append_row(fields)
+
+    def value(self, row, column):
+        return self.values[column][row]
+
+    def rows(self):
+        columns = [self.values[name] for name in self.columns]
+        return [list(row) for row in zip(*columns)] if columns else []
+
+    def set_value(self, row, column, value):
+        self.values[self.add_column(column)][row] = value
+
+
+def diff_tables(old, new):
+    # Sel yang berubah antara dua versi tabel, sebagai (baris, kolom), hanya
+    # untuk baris yang ada di keduanya; None bila susunan kolomnya berbeda.
+    # Kolom yang sama persis dibandingkan sekaligus, sisanya per sel di C.
+    if old.columns != new.columns:
+        return None
+    changes = []
+    for column in new.columns:
+        before, after = old.values[column], new.values[column]
+        if before != after:
+            changed = itertools.compress(itertools.count(), map(operator.ne, before, after))
+            changes.extend((row, column) for row in changed)
+    return changes
+
+
+EXPRESSION_BUILTINS = {name: getattr(builtins, name)
+                       for name in ("abs", "float", "format", "hex", "int", "len", "max", "min", "round", "str")}
+
+
+def match_rows(data, column, pattern, ignore_case=False):
+    # Baris yang nilai kolomnya cocok dengan regex (re.search)
+    search = re.compile(pattern, re.IGNORECASE if ignore_case else 0).search
+    return [row for row, value in enumerate(data.values[column]) if search(value)]
+
+
+def replace_operation(pattern, replacement, regex=True, ignore_case=False):
+    if not regex:
+        # Teks biasa: pola di-escape dan pengganti dipakai apa adanya
+        pattern, literal = re.escape(pattern), replacement
+        replacement = lambda match: literal
+    sub = functools.partial(re.compile(pattern, re.IGNORECASE if ignore_case else 0).sub, replacement)
+    return lambda data, column, rows, values: list(map(sub, values))
+
+
+def set_operation(value):
+    return lambda data, column, rows, values: [value] * len(values)
+
+
+def expression_operation(expression):
+    # Ekspresi Python per sel: value, row, get(kolom) untuk kolom lain di
+    # baris yang sama, modul re dan beberapa fungsi bawaan yang aman
+    code = compile(expression, "<expression>", "eval")
+
+    def apply(data, column, rows, values):
+        scope = {"__builtins__": EXPRESSION_BUILTINS, "re": re}
+        result = []
+        for row, value in zip(rows, values):
+            scope.update(value=value, row=row, get=lambda name, row=row: data.value(row, name))
+            try:
+                result.append(str(eval(code, scope)))
+            except Exception as e:
+                raise ValueError(f"Row {row}, {column}: {type(e).__name__}: {e}")
+        return result
+
+    return apply
+
+
+def bulk_edit(data, columns, rows, operation):
+    # Jalankan operation per kolom sekaligus (bukan per sel widget) dan
+    # kembalikan hanya sel yang berubah sebagai (baris, kolom, lama, baru).
+    # rows None berarti semua baris.
+    rows = range(data.row_count) if rows is None else rows
+    changes = []
+    for column in columns:
+        values = data.values[column]
+        selected = values if isinstance(rows, range) else [values[row] for row in rows]
+        result = operation(data, column, rows, selected)
+        changes.extend((row, column, old, new) for row, old, new in zip(rows, selected, result) if old != new)
+    return changes
+
+
+class TableCache:
+    # Snapshot tabel terakhir per nama tabel, dibuang yang paling lama tidak
+    # dipakai bila total sel melewati batas.
+    def __init__(self, max_cells=CACHE_MAX_CELLS):
+        self.max_cells = max_cells
+        self.entries = OrderedDict()
+        self.cells = 0
+
+    @staticmethod
+    def size(table):
+        return max(1, table.row_count * len(table.columns))
+
+    def get(self, name):
+        table = self.entries.get(name)
+        if table is not None:
+            self.entries.move_to_end(name)
+        return table
+
+    def put(self, name, table):
+        self.invalidate(name)
+        self.entries[name] = table
+        self.cells += self.size(table)
+        while self.cells > self.max_cells and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.cells -= self.size(evicted)
+
+    def fits(self, table):
+        return self.cells + self.size(table) <= self.max_cells
+
+    def invalidate(self, name):
+        table = self.entries.pop(name, None)
+        if table is not None:
+            self.cells -= self.size(table)
+
+    def clear(self):
+        self.entries.clear()
+        self.cells = 0
+
+
+class UsageStats:
+    # Statistik pemakaian tabel milik pengguna (file di home), dipakai untuk
+    # mengurutkan prefetch: skor naik 1 tiap tabel dibuka dan meluruh
+    # separuh tiap USAGE_HALF_LIFE detik, jadi tabel yang sering dan baru
+    # dipakai didahulukan. Pengaturan prefetch ikut disimpan di sini.
+    def __init__(self, file_name=USAGE_FILE):
+        self.file_name = file_name
+        self.tables = {}
+        self.settings = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.file_name, 'r') as f:
+                data = json.load(f)
+            self.tables = data.get("tables", {})
+            self.settings = data.get("settings", {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.file_name), exist_ok=True)
+        temp_name = self.file_name + ".tmp"
+        with open(temp_name, 'w') as f:
+            json.dump({"tables": self.tables, "settings": self.settings}, f)
+        os.replace(temp_name, self.file_name)
+
+    def score(self, table, now=None):
+        entry = self.tables.get(table)
+        if not entry:
+            return 0.0
+        now = time.time() if now is None else now
+        return entry["score"] * 0.5 ** (max(0.0, now - entry["last"]) / USAGE_HALF_LIFE)
+
+    def record(self, table, now=None):
+        now = time.time() if now is None else now
+        self.tables[table] = {"score": self.score(table, now) + 1.0, "last": now}
+
+    def rank(self, tables, now=None):
+        # Tabel yang belum pernah dipakai tetap dalam urutan aslinya
+        now = time.time() if now is None else now
+        return sorted(tables, key=lambda table: -self.score(table, now))
+
+
+class DeviceCache:
+    # Cache per perangkat di disk (satu direktori per device_key): daftar
+    # tabel dan kolom tiap tabel, ditambah salinan isi tabel bila diminta.
+    # Dipakai untuk menampilkan daftar tabel dan header kolom segera setelah
+    # connect, lalu divalidasi ulang dengan data dari modem. hosts.json
+    # mencatat perangkat terakhir di tiap alamat agar cache bisa dibuka
+    # sebelum identitas perangkat terbaca.
+    def __init__(self, key, root=DEVICE_CACHE_DIR):
+        self.key = key
+        self.root = root
+        self.directory = os.path.join(root, key)
+        self.info = {}
+        self.tables = []
+        self.schemas = {}
+        self.dirty = False
+        self.load()
+
+    @classmethod
+    def for_host(cls, host, root=DEVICE_CACHE_DIR):
+        key = cls.read_hosts(root).get(host)
+        return cls(key, root) if key else None
+
+    @staticmethod
+    def read_hosts(root):
+        try:
+            with open(os.path.join(root, "hosts.json"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def write_json(file_name, data):
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        temp_name = file_name + ".tmp"
+        with open(temp_name, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_name, file_name)
+
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, "schema.json"), 'r') as f:
+                data = json.load(f)
+            self.info = data.get("info", {})
+            self.tables = data.get("tables", [])
+            self.schemas = data.get("schemas", {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        if self.dirty:
+            self.write_json(os.path.join(self.directory, "schema.json"),
+                            {"info": self.info, "tables": self.tables, "schemas": self.schemas})
+            self.dirty = False
+
+    def remember(self, host, info):
+        hosts = self.read_hosts(self.root)
+        if hosts.get(host) != self.key:
+            hosts[host] = self.key
+            self.write_json(os.path.join(self.root, "hosts.json"), hosts)
+        if info != self.info:
+            self.info = info
+            self.dirty = True
+
+    def set_tables(self, tables):
+        if tables != self.tables:
+            self.tables = list(tables)
+            self.dirty = True
+
+    def set_schema(self, table, columns):
+        if self.schemas.get(table) != columns:
+            self.schemas[table] = list(columns)
+            self.dirty = True
+
+    def table_file(self, table):
+        return os.path.join(self.directory, "tables", DEVICE_KEY_PATTERN.sub("_", table) + ".json")
+
+    def load_table(self, table):
+        # Kembalikan (data, waktu simpan) atau None
+        try:
+            with open(self.table_file(table), 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("table") != table:
+            return None
+        data = TableData()
+        data.columns = stored["columns"]
+        data.values = stored["values"]
+        data.row_count = stored["rows"]
+        return data, stored["timestamp"]
+
+    def save_table(self, table, data):
+        self.write_json(self.table_file(table),
+                        {"table": table, "timestamp": time.time(), "columns": data.columns,
+                         "values": data.values, "rows": data.row_count})
+
+    def invalidate_table(self, table):
+        try:
+            os.remove(self.table_file(table))
+        except OSError:
+            pass
+
+
+def command_type(command):
+    for kind in COMMAND_TYPES:
+        if command.startswith(f"sendcmd 1 {kind}"):
+            return kind
+    return "other"
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class CommandMetrics:
+    # Ring buffer waktu per perintah (detik). Ditulis dari thread worker dan
+    # dibaca dari GUI, jadi semua akses lewat lock.
+    def __init__(self, capacity=METRICS_CAPACITY):
+        self.entries = deque(maxlen=capacity)
+        self.lock = threading.Lock()
+
+    def record(self, command, **values):
+        entry = dict.fromkeys(METRIC_FIELDS, 0.0)
+        entry.update(timestamp=time.time(), type=command_type(command), command=command, bytes=0)
+        entry.update(values)
+        with self.lock:
+            self.entries.append(entry)
+        return entry
+
+    def annotate(self, command, **values):
+        # Tambahkan waktu dari sisi GUI (parse/render) ke entri terakhir
+        # perintah tersebut
+        with self.lock:
+            for entry in reversed(self.entries):
+                if entry["command"] == command:
+                    for key, value in values.items():
+                        entry[key] += value
+                    return entry
+        return None
+
+    def records(self):
+        with self.lock:
+            return [dict(entry) for entry in self.entries]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def summary(self):
+        groups = {}
+        for entry in self.records():
+            groups.setdefault(entry["type"], []).append(entry)
+        result = {}
+        for kind, entries in groups.items():
+            totals = [(e["send"] + e["read"] + e["parse"] + e["render"]) * 1000 for e in entries]
+            histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            for total in totals:
+                histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, total)] += 1
+            result[kind] = {
+                "count": len(entries),
+                "p50_ms": percentile(totals, 0.5),
+                "p95_ms": percentile(totals, 0.95),
+                "max_ms": max(totals),
+                "ttfb_p50_ms": percentile([e["ttfb"] * 1000 for e in entries], 0.5),
+                "read_p50_ms": percentile([e["read"] * 1000 for e in entries], 0.5),
+                "parse_p50_ms": percentile([e["parse"] * 1000 for e in entries], 0.5),
+                "render_p50_ms": percentile([e["render"] * 1000 for e in entries], 0.5),
+                "bytes": sum(e["bytes"] for e in entries),
+                "histogram": histogram,
+            }
+        return result
+
+    def export_json(self, file_name):
+        with open(file_name, 'w') as f:
+            json.dump({"histogram_bounds_ms": HISTOGRAM_BOUNDS_MS, "summary": self.summary(),
+                       "commands": self.records()}, f, indent=2)
+
+    def export_csv(self, file_name):
+        with open(file_name, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records())
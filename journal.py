@@ -0,0 +1,233 @@
+import json
+import os
+import time
+
+from core import set_command
+
+# Commit transaksional. Setiap perubahan (tabel, baris, kolom, nilai lama,
+# nilai baru) ditulis dulu ke journal di disk, satu file JSON Lines per
+# commit yang hanya ditambah. Setelah itu perubahan dikirim per batch,
+# diverifikasi dengan satu "DB p" per tabel, dan bila ada yang gagal semua
+# sel dikembalikan ke nilai lamanya dari journal. Journal yang tidak
+# berakhir committed atau rolled_back berarti commit terputus; isinya tetap
+# bisa di-rollback kapan saja, juga setelah aplikasi ditutup.
+JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".zdbedit", "journal")
+JOURNAL_KEEP = 50
+COMMIT_BATCH_SIZE = 200
+CHANGE_FIELDS = ("table", "row", "column", "old", "new")
+OLD_VALUE, NEW_VALUE = 3, 4
+FINAL_STATES = ("committed", "rolled_back")
+
+
+class CommitJournal:
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.header = {}
+        self.changes = []
+        self.states = []
+        self.load()
+
+    @classmethod
+    def create(cls, host, changes, root=JOURNAL_DIR):
+        # Journal harus sudah di disk (fsync) sebelum perintah pertama dikirim
+        os.makedirs(root, exist_ok=True)
+        prune_journals(root)
+        file_name = os.path.join(root, time.strftime("%Y%m%d-%H%M%S-") + f"{time.time_ns() % 10**9:09d}.jsonl")
+        with open(file_name, 'x', encoding='utf-8') as f:
+            f.write(json.dumps({"host": host, "timestamp": time.time(), "changes": len(changes)}) + "\n")
+            for change in changes:
+                f.write(json.dumps(dict(zip(CHANGE_FIELDS, change)), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(file_name)
+
+    def load(self):
+        with open(self.file_name, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        for number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Baris terakhir bisa terpotong bila proses mati saat menulis
+                continue
+            if number == 0:
+                self.header = record
+            elif "state" in record:
+                self.states.append(record)
+            else:
+                self.changes.append(tuple(record[field] for field in CHANGE_FIELDS))
+
+    def append(self, state, **details):
+        record = dict({"state": state, "timestamp": time.time()}, **details)
+        self.states.append(record)
+        with open(self.file_name, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @property
+    def state(self):
+        if self.states:
+            return self.states[-1]["state"]
+        # Daftar perubahan tidak lengkap: proses berhenti sebelum mengirim apa pun
+        return "prepared" if len(self.changes) == self.header.get("changes") else "aborted"
+
+    @property
+    def pending(self):
+        return self.state not in FINAL_STATES + ("aborted",)
+
+    @property
+    def host(self):
+        return self.header.get("host", "")
+
+    @property
+    def tables(self):
+        return sorted({change[0] for change in self.changes})
+
+    def describe(self):
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.header.get("timestamp", 0)))
+        return f"{started}  {self.host}  {', '.join(self.tables)}  ({len(self.changes)} changes, {self.state})"
+
+
+def list_journals(root=JOURNAL_DIR):
+    # Terbaru dulu; nama file diawali waktu pembuatan
+    try:
+        names = sorted((name for name in os.listdir(root) if name.endswith(".jsonl")), reverse=True)
+    except OSError:
+        return []
+    journals = []
+    for name in names:
+        try:
+            journals.append(CommitJournal(os.path.join(root, name)))
+        except (OSError, ValueError, KeyError):
+            pass
+    return journals
+
+
+def pending_journals(host=None, root=JOURNAL_DIR):
+    return [journal for journal in list_journals(root)
+            if journal.pending and (host is None or journal.host == host)]
+
+
+def prune_journals(root=JOURNAL_DIR, keep=JOURNAL_KEEP):
+    # Journal commit yang terputus tidak pernah dihapus otomatis
+    finished = [journal for journal in list_journals(root) if not journal.pending]
+    for journal in finished[keep:]:
+        try:
+            os.remove(journal.file_name)
+        except OSError:
+            pass
+
+
+def read_tables(session, changes):
+    return {table: session.read_table(table) for table in sorted({change[0] for change in changes})}
+
+
+def current_value(data, row, column):
+    # None bila baris atau kolomnya tidak ada di modem
+    values = data.values.get(column)
+    return values[row] if values is not None and 0 <= row < data.row_count else None
+
+
+def last_changes(changes):
+    # Satu perubahan per sel: kemunculan terakhirnya di daftar
+    return list({change[:3]: change for change in changes}.values())
+
+
+def read_old_values(session, cells):
+    # Lengkapi (tabel, baris, kolom, nilai baru) dengan nilai lamanya, satu
+    # "DB p" per tabel; untuk pemanggil yang tidak memegang isi tabel (CLI).
+    # Sel yang tidak ada dianggap kosong.
+    tables = read_tables(session, cells)
+    return [(table, row, column, current_value(tables[table], row, column) or "", new)
+            for table, row, column, new in cells]
+
+
+def apply_changes(session, changes, field, on_progress=None, on_error=None, on_batch=None,
+                  batch_size=COMMIT_BATCH_SIZE):
+    # Kirim nilai field (OLD_VALUE atau NEW_VALUE) per batch; tiap batch
+    # diakhiri "DB save" sehingga yang sudah dikonfirmasi tidak hilang bila
+    # koneksi putus di batch berikutnya. Indeks di on_error berlaku untuk
+    # seluruh daftar. Semua perintah disusun dulu, jadi nilai yang ditolak
+    # set_command menggagalkan commit sebelum batch pertama terkirim.
+    commands = [set_command(change[0], change[1], change[2], change[field]) for change in changes]
+    for start in range(0, len(changes), batch_size):
+        batch = commands[start:start + batch_size]
+        session.set_batch(batch,
+                          lambda done: on_progress and on_progress(start + min(done, len(batch))),
+                          lambda index, error: on_error and on_error(start + index, error))
+        if on_batch:
+            on_batch(start + len(batch))
+
+
+def verify_changes(session, changes, field):
+    # Baca ulang tiap tabel sekali dan bandingkan dengan nilai field. Sel
+    # yang muncul lebih dari sekali dinilai dari kemunculan terakhirnya.
+    # Hasilnya perubahan yang tidak sesuai dengan isi modem.
+    tables = read_tables(session, changes)
+    return [change for change in last_changes(changes)
+            if current_value(tables[change[0]], change[1], change[2]) != change[field]]
+
+
+def commit_journal(session, journal, on_progress=None, on_error=None, batch_size=COMMIT_BATCH_SIZE):
+    # Hasilnya dict berisi state akhir journal ("committed", "rolled_back"
+    # atau "rollback_failed"), perubahan yang ditolak modem beserta
+    # pesannya, perubahan yang tidak terbaca kembali, dan error koneksi.
+    changes = journal.changes
+    result = {"journal": journal.file_name, "changes": len(changes), "failed": [], "mismatches": [],
+              "error": None}
+
+    def error(index, message):
+        result["failed"].append((changes[index], message))
+        if on_error:
+            on_error(index, message)
+
+    try:
+        apply_changes(session, changes, NEW_VALUE, on_progress, error,
+                      lambda done: journal.append("applied", done=done), batch_size)
+        # Sel yang sudah ditolak modem tidak dilaporkan lagi sebagai mismatch
+        failed = {change[:3] for change, _ in result["failed"]}
+        result["mismatches"] = [change for change in verify_changes(session, changes, NEW_VALUE)
+                                if change[:3] not in failed]
+    except Exception as e:
+        result["error"] = str(e)
+    if not result["failed"] and not result["mismatches"] and result["error"] is None:
+        journal.append("committed")
+        if on_progress:
+            on_progress(len(changes) + 1)
+        result["state"] = "committed"
+        return result
+    journal.append("failed", rejected=len(result["failed"]), mismatches=len(result["mismatches"]),
+                   error=result["error"])
+    result.update(rollback_journal(session, journal, on_progress, batch_size))
+    return result
+
+
+def rollback_journal(session, journal, on_progress=None, batch_size=COMMIT_BATCH_SIZE):
+    # Kembalikan sel ke nilai lamanya. Daftar dibalik agar sel yang diubah
+    # berkali-kali kembali ke nilai paling awal. Hanya sel yang isinya di
+    # modem berbeda dari nilai lama yang dikirim, jadi perubahan yang dulu
+    # ditolak modem (mis. baris yang tidak ada) tidak menggagalkan rollback.
+    result = {"state": "rollback_failed", "rollback_failed": [], "rollback_mismatches": [],
+              "rollback_error": None}
+    try:
+        changes = last_changes(journal.changes[::-1])
+        tables = read_tables(session, changes)
+        changes = [change for change in changes
+                   if current_value(tables[change[0]], change[1], change[2]) not in (None, change[OLD_VALUE])]
+        apply_changes(session, changes, OLD_VALUE, on_progress,
+                      lambda index, message: result["rollback_failed"].append((changes[index], message)),
+                      batch_size=batch_size)
+        if changes:
+            failed = {change[:3] for change, _ in result["rollback_failed"]}
+            result["rollback_mismatches"] = [change for change in verify_changes(session, changes, OLD_VALUE)
+                                             if change[:3] not in failed]
+    except Exception as e:
+        result["rollback_error"] = str(e)
+    if result["rollback_failed"] or result["rollback_mismatches"] or result["rollback_error"] is not None:
+        journal.append("rollback_failed", rejected=len(result["rollback_failed"]),
+                       mismatches=len(result["rollback_mismatches"]), error=result["rollback_error"])
+    else:
+        journal.append("rolled_back")
+        result["state"] = "rolled_back"
+    return result
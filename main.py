@@ -1,84 +1,1003 @@
-import warnings
-warnings.simplefilter("ignore", DeprecationWarning)
+import bisect
+import functools
+import json
+import os
 import re
-import telnetlib
 import time
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QLabel, QLineEdit, QPushButton, QListWidget, QTableWidget,
-                               QTableWidgetItem, QMessageBox, QHeaderView,
-                               QProgressBar, QCompleter, QFileDialog)
-from PySide6.QtGui import QAction, QIcon, QPixmap
-from PySide6.QtCore import Qt, QObject, QThread, Signal, QStringListModel, QByteArray
-from gambar import App_Icon
+                               QLabel, QLineEdit, QPushButton, QListView, QTableView,
+                               QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView,
+                               QProgressBar, QCompleter, QFileDialog, QDialog, QComboBox,
+                               QSpinBox, QFormLayout, QListWidget, QListWidgetItem, QDockWidget,
+                               QInputDialog, QCheckBox, QAbstractItemView)
+from PySide6.QtGui import QAction, QColor, QIcon, QPixmap
+from PySide6.QtCore import (Qt, QObject, QThread, QTimer, Signal, QByteArray,
+                            QAbstractListModel, QAbstractTableModel, QModelIndex)
 from datetime import datetime
+from core import (CommandMetrics, CommandScheduler, DeviceCache, OperationCancelled, TableCache, TableData,
+                  TableNameIndex, TableParser, TelnetSession, UsageStats, ValueIndex,
+                  FLEET_CONCURRENCY, FLEET_RETRIES, HISTOGRAM_BOUNDS_MS, KEEPALIVE_INTERVAL, KEEPALIVE_MAX_DELAY,
+                  KEEPALIVE_RETRY_DELAY, POOL_MAX_SESSIONS, PREFETCH_BUDGET, PRIORITY_BACKGROUND, PRIORITY_CONTROL, PRIORITY_INTERACTIVE,
+                  PRIORITY_WRITE, WATCH_INTERVAL,
+                  bulk_edit, device_info, diff_tables, expression_operation, match_rows, replace_operation,
+                  set_operation, device_key, fleet_command, fleet_read_table, fleet_set_value, load_fleet_targets,
+                  parse_table_list, run_fleet)
+from journal import CommitJournal, commit_journal, list_journals, pending_journals, rollback_journal
+from offline import ChangeSet, check_changes
+from snapshot import diff_snapshots, dump_database, read_snapshot, read_snapshot_table
+from table_io import diff_table_file, export_table, import_changes
 
 
 
 
+ICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icon.png")
+
+
+@functools.cache
+def app_pixmap(size=None):
+    # Ikon dimuat sekali lalu disimpan. icon.png dipakai bila ada; modul
+    # gambar (base64 ~600 KB) hanya diimpor sebagai cadangan, mis. di exe.
+    if size is not None:
+        return app_pixmap().scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    pixmap = QPixmap(ICON_FILE)
+    if pixmap.isNull():
+        from gambar import App_Icon
+        pixmap.loadFromData(QByteArray.fromBase64(App_Icon.encode()), "PNG")
+    return pixmap
+
+
 class Worker(QObject):
-    connected = Signal()
-    connect_error = Signal(str)
-    command_output = Signal(str, str)
-    command_error = Signal(str, str)
+    # Semua operasi sesi lewat CommandScheduler: GUI memanggil request()
+    # dari threadnya sendiri, worker menjalankan antrian satu per satu.
+    # Setiap sinyal hasil membawa id permintaan.
+    connected = Signal(int)
+    identified = Signal(int, object)
+    connect_error = Signal(int, str)
+    command_output = Signal(int, str, str)
+    command_error = Signal(int, str, str)
+    command_cancelled = Signal(int, str)
+    batch_progress = Signal(int, int)
+    commit_finished = Signal(int, object)
+    changes_checked = Signal(int, list, list, list)
+    table_started = Signal(int, str)
+    table_rows = Signal(int, str, list)
+    table_finished = Signal(int, str)
+    table_prefetched = Signal(int, str, object, float)
+    table_polled = Signal(int, str, str, object)
+    watch_failed = Signal(int, str, str)
+    dump_progress = Signal(int, int)
+    dump_finished = Signal(int, str, int)
+    export_progress = Signal(int, int)
+    export_finished = Signal(int, str, str, int)
+    import_ready = Signal(int, str, str, list, dict)
+    reconnected = Signal()
+    keepalive_failed = Signal(int, str)
     
-    start_connect = Signal(str, str, str)
-    start_command = Signal(str)
-    start_disconnect = Signal()
+    wake = Signal()
 
-    def __init__(self):
+    def __init__(self, **session_options):
         super().__init__()
-        self.tn = None
-        
-        self.start_connect.connect(self.connect_to_modem)
-        self.start_command.connect(self.send_command)
-        self.start_disconnect.connect(self.disconnect)
+        self.session = TelnetSession(on_reconnect=self.reconnected.emit, **session_options)
+        self.scheduler = CommandScheduler(on_cancel=self.session.cancel)
+        self.current = None
+        self.handlers = {
+            "connect": self.connect_to_modem,
+            "identify": self.identify,
+            "command": self.send_command,
+            "fetch": self.fetch_table,
+            "prefetch": self.prefetch_table,
+            "watch": self.watch_table,
+            "commit": self.commit_changes,
+            "rollback": self.rollback_commit,
+            "check": self.check_change_set,
+            "dump": self.dump_database,
+            "export": self.export_table,
+            "import": self.import_table,
+            "keepalive": self.keep_alive,
+            "disconnect": self.disconnect,
+        }
+        self.wake.connect(self.process)
 
-    def connect_to_modem(self, ip, user, password):
+    def request(self, kind, *args, priority=PRIORITY_INTERACTIVE, key=None, group=None, preemptible=False):
+        request_id, queued = self.scheduler.submit(kind, args, priority, key, group, preemptible)
+        if queued:
+            self.wake.emit()
+        return request_id
+
+    def process(self):
+        while True:
+            request = self.scheduler.next()
+            if request is None:
+                return
+            self.current = request
+            # Pembatalan dari scheduler hanya mengenai operasi milik permintaan ini
+            self.session.owner = request
+            try:
+                self.handlers[request.kind](request.id, *request.args)
+            finally:
+                self.session.owner = None
+                self.current = None
+                self.scheduler.done(request)
+
+    def connect_to_modem(self, request_id, ip, user, password, sessions=1):
         try:
-            self.tn = telnetlib.Telnet(ip)
-            self.tn.read_until(b"Login: ")
-            self.tn.write(user.encode('ascii') + b"\n")
-            self.tn.read_until(b"Password: ")
-            self.tn.write(password.encode('ascii') + b"\n")
-            
-            response = self.tn.read_until(b"^", timeout=2).decode('ascii')
-            if "incorrect" in response.lower():
-                raise ConnectionError("Login failed")
-            
-            self.connected.emit()
+            self.session.connect(ip, user, password)
+            if sessions > 1:
+                self.session.open_pool(sessions)
+            self.connected.emit(request_id)
         except Exception as e:
-            self.connect_error.emit(str(e))
+            self.connect_error.emit(request_id, str(e))
             
-    def send_command(self, command):
+    def identify(self, request_id):
+        self.identified.emit(request_id, device_info(self.session))
+
+    def send_command(self, request_id, command):
         try:
-            if not self.tn:
-                raise RuntimeError("Not connected to modem")
-            
-            self.tn.write(command.encode('ascii') + b"\n")
-            time.sleep(0.5)
-            output = b""
-            while True:
-                chunk = self.tn.read_very_eager()
-                if not chunk:
-                    break
-                output += chunk
-            output = output.decode('ascii')
-            self.command_output.emit(command, output)
+            output = self.session.command(command)
+            self.command_output.emit(request_id, command, output)
+        except Exception as e:
+            self.fail(request_id, command, e)
+
+    def fetch_table(self, request_id, table):
+        try:
+            self.session.check_connected()
+            self.table_started.emit(request_id, table)
+            # Setelah sambung ulang tabel di-stream dari awal lagi
+            self.session.stream_table(table, lambda rows: self.table_rows.emit(request_id, table, rows),
+                                      on_retry=lambda: self.table_started.emit(request_id, table))
+            self.table_finished.emit(request_id, table)
+        except Exception as e:
+            self.fail(request_id, f"sendcmd 1 DB p {table}", e)
+
+    def prefetch_table(self, request_id, tables):
+        # Fetch latar belakang untuk cache dan indeks nilai, satu tabel per
+        # sesi di pool; gagal tidak menghentikan prefetch tabel lain. Bila
+        # didahului perintah interaktif, tabel yang belum selesai diulang
+        # setelahnya.
+        start = time.perf_counter()
+        remaining = list(tables)
+
+        def deliver(table, data):
+            remaining.remove(table)
+            self.table_prefetched.emit(request_id, table, data, time.perf_counter() - start)
+
+        try:
+            self.session.read_tables(tables, deliver)
+        except OperationCancelled:
+            if self.current.preempted:
+                self.current.args = (remaining,)
+                self.scheduler.requeue(self.current)
+                return
+        except Exception:
+            pass
+        for table in list(remaining):
+            deliver(table, None)
+
+    def watch_table(self, request_id, table, digest):
+        # Poll mode pantau; bila didahului perintah interaktif cukup
+        # dilewati, poll berikutnya menyusul
+        try:
+            digest, data = self.session.poll_table(table, digest)
+            self.table_polled.emit(request_id, table, digest, data)
+        except OperationCancelled:
+            pass
+        except Exception as e:
+            self.watch_failed.emit(request_id, table, str(e))
+
+    def commit_changes(self, request_id, changes):
+        # Tanpa journal di disk tidak ada yang dikirim ke modem
+        try:
+            self.session.check_connected()
+            journal = CommitJournal.create(self.session.host or "", changes)
+        except Exception as e:
+            self.fail(request_id, "sendcmd 1 DB set", e)
+            return
+        result = commit_journal(self.session, journal, lambda done: self.batch_progress.emit(request_id, done))
+        self.commit_finished.emit(request_id, result)
+
+    def rollback_commit(self, request_id, file_name):
+        try:
+            self.session.check_connected()
+            journal = CommitJournal(file_name)
+        except Exception as e:
+            self.fail(request_id, f"rollback {file_name}", e)
+            return
+        result = rollback_journal(self.session, journal, lambda done: self.batch_progress.emit(request_id, done))
+        self.commit_finished.emit(request_id, dict(result, journal=file_name, changes=len(journal.changes)))
+
+    def check_change_set(self, request_id, cells):
+        try:
+            self.session.check_connected()
+            self.changes_checked.emit(request_id, *check_changes(self.session, cells))
+        except Exception as e:
+            self.fail(request_id, "check change set", e)
+
+    def dump_database(self, request_id, file_name, tables):
+        try:
+            count = dump_database(self.session, file_name, tables, self.dump_progress.emit)
+            self.dump_finished.emit(request_id, file_name, count)
         except Exception as e:
-            self.command_error.emit(command, str(e))
+            self.fail(request_id, "sendcmd 1 DB p", e)
+
+    def export_table(self, request_id, table, file_name):
+        try:
+            rows = export_table(self.session, table, file_name,
+                                         lambda rows: self.export_progress.emit(request_id, rows))
+            self.export_finished.emit(request_id, table, file_name, rows)
+        except Exception as e:
+            self.fail(request_id, f"sendcmd 1 DB p {table}", e)
+
+    def import_table(self, request_id, table, file_name):
+        # Bandingkan dengan data terbaru dari modem, bukan salinan di cache
+        try:
+            changes, problems = diff_table_file(self.session.read_table(table), file_name)
+            self.import_ready.emit(request_id, table, file_name, changes, problems)
+        except Exception as e:
+            self.fail(request_id, f"import {file_name}", e)
+
+    def keep_alive(self, request_id):
+        # Keep-alive yang didahului perintah lain cukup dilewati; perintah
+        # itu sendiri sudah menjaga koneksi
+        try:
+            self.session.keep_alive()
+        except OperationCancelled:
+            pass
+        except Exception as e:
+            self.keepalive_failed.emit(request_id, str(e))
+
+    def fail(self, request_id, command, error):
+        if isinstance(error, OperationCancelled):
+            # Fetch yang digantikan permintaan baru dibatalkan tanpa pesan
+            if not (self.current and self.current.superseded):
+                self.command_cancelled.emit(request_id, command)
+        else:
+            self.command_error.emit(request_id, command, str(error))
+
+    def disconnect(self, request_id):
+        self.session.close()
+
+    def stop(self):
+        # Dipanggil dari thread GUI saat keluar: buang antrian baca dan batalkan
+        # baca yang sedang jalan, tapi commit yang sudah diminta tetap selesai
+        self.scheduler.clear(below=PRIORITY_WRITE)
+        current = self.current
+        if current and current.priority != PRIORITY_WRITE:
+            self.session.cancel(current)
+
+
+SEARCH_DEBOUNCE_MS = 150
+COMMIT_REPORT_LINES = 20
+HIGHLIGHT_COLOR = QColor(255, 193, 7, 90)
+
+
+class TableListModel(QAbstractListModel):
+    # Daftar tabel yang sudah difilter. Baris dipetakan lewat hasil
+    # TableNameIndex, jadi mengganti filter cukup satu reset model tanpa
+    # memanggil filterAcceptsRow/lessThan Python untuk setiap baris.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index_data = TableNameIndex()
+        self.visible = []
+
+    def set_tables(self, tables, query=""):
+        self.index_data = TableNameIndex(tables)
+        self.set_filter(query)
+
+    def set_filter(self, query):
+        self.beginResetModel()
+        self.visible = self.index_data.search(query)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self.index_data.names[self.visible[index.row()]]
+        return None
+
+
+class DBTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = TableData()
+        self.edits = {}
+        self.message = None
+        self.read_only = False
+        self.highlights = set()
+
+    def set_table(self, table, read_only=False):
+        self.beginResetModel()
+        self.table = table
+        self.edits = {}
+        self.message = None
+        self.read_only = read_only
+        self.highlights = set()
+        self.endResetModel()
+
+    def set_message(self, message):
+        self.beginResetModel()
+        self.table = TableData()
+        self.edits = {}
+        self.message = message
+        self.read_only = False
+        self.highlights = set()
+        self.endResetModel()
+
+    def apply_table(self, table):
+        # Ganti data dengan versi baru dari mode pantau: hanya sel yang
+        # berubah yang digambar ulang dan ditandai. Hasilnya daftar
+        # (baris, kolom, lama, baru), atau None bila susunan kolom berubah.
+        old = self.table
+        cells = diff_tables(old, table)
+        if cells is None:
+            self.beginResetModel()
+            self.table = table
+            self.edits = {key: value for key, value in self.edits.items()
+                          if key[0] < table.row_count and key[1] in table.values}
+            self.highlights = set()
+            self.endResetModel()
+            return None
+        if table.row_count > old.row_count:
+            self.beginInsertRows(QModelIndex(), old.row_count, table.row_count - 1)
+            self.table = table
+            self.endInsertRows()
+            cells.extend((row, column) for row in range(old.row_count, table.row_count)
+                         for column in table.columns)
+        elif table.row_count < old.row_count:
+            self.beginRemoveRows(QModelIndex(), table.row_count, old.row_count - 1)
+            self.table = table
+            self.edits = {key: value for key, value in self.edits.items() if key[0] < table.row_count}
+            self.highlights = {key for key in self.highlights if key[0] < table.row_count}
+            self.endRemoveRows()
+        else:
+            self.table = table
+        changes = []
+        for row, column in cells:
+            self.highlights.add((row, column))
+            index = self.index(row, table.columns.index(column))
+            self.dataChanged.emit(index, index)
+            if row < old.row_count:
+                changes.append((row, column, old.value(row, column), table.value(row, column)))
+        return changes
+
+    def clear_highlights(self):
+        highlights, self.highlights = self.highlights, set()
+        for row, column in highlights:
+            index = self.index(row, self.table.columns.index(column))
+            self.dataChanged.emit(index, index, [Qt.BackgroundRole])
+
+    def append_rows(self, rows):
+        # Tambah baris hasil stream; kolom baru disisipkan di posisi urutnya
+        table = self.table
+        for name in sorted({name for _, fields in rows for name, _ in fields}):
+            if name not in table.values:
+                position = bisect.bisect(table.columns, name)
+                self.beginInsertColumns(QModelIndex(), position, position)
+                table.add_column(name)
+                self.endInsertColumns()
+        first = table.row_count
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for _, fields in rows:
+            table.append_row(fields)
+        self.endInsertRows()
+
+    def prune_columns(self):
+        # Buang kolom dari cache skema yang tidak muncul di data modem
+        table = self.table
+        for name in sorted(table.unconfirmed):
+            position = table.columns.index(name)
+            self.beginRemoveColumns(QModelIndex(), position, position)
+            table.remove_column(name)
+            self.endRemoveColumns()
+            self.edits = {key: value for key, value in self.edits.items() if key[1] != name}
+
+    def effective_table(self):
+        # Data seperti yang terlihat: kolom yang punya edit disalin dan diisi
+        # nilai editnya, kolom lain dipakai bersama
+        if not self.edits:
+            return self.table
+        table = TableData()
+        table.columns = self.table.columns
+        table.row_count = self.table.row_count
+        table.values = dict(self.table.values)
+        for (row, column), value in self.edits.items():
+            if table.values[column] is self.table.values[column]:
+                table.values[column] = list(table.values[column])
+            table.values[column][row] = value
+        return table
+
+    def apply_edits(self, changes):
+        for row, column, _, value in changes:
+            key = (row, column)
+            if value != self.table.value(row, column):
+                self.edits[key] = value
+            else:
+                self.edits.pop(key, None)
+        if changes:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    def commit_edits(self, cells):
+        # Masukkan sel (baris, kolom, nilai) yang sudah tersimpan di modem ke
+        # data tabel; hanya sel itu yang digambar ulang. Edit yang dibuat
+        # setelah batch dikirim tetap tertunda.
+        changes = []
+        for row, column, value in cells:
+            if row >= self.table.row_count or column not in self.table.values:
+                continue
+            if self.edits.get((row, column)) == value:
+                del self.edits[(row, column)]
+            changes.append((row, column, self.table.value(row, column), value))
+            self.table.set_value(row, column, value)
+            index = self.index(row, self.table.columns.index(column))
+            self.dataChanged.emit(index, index)
+        return changes
+
+    def clear_edits(self):
+        if self.edits:
+            self.edits = {}
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self.message is not None else self.table.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self.message is not None else len(self.table.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if self.message is not None:
+            if role == Qt.DisplayRole:
+                return self.message
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            column = self.table.columns[index.column()]
+            key = (index.row(), column)
+            if key in self.edits:
+                return self.edits[key]
+            return self.table.value(index.row(), column)
+        if role == Qt.BackgroundRole and self.highlights:
+            if (index.row(), self.table.columns[index.column()]) in self.highlights:
+                return HIGHLIGHT_COLOR
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or self.message is not None:
+            return False
+        column = self.table.columns[index.column()]
+        key = (index.row(), column)
+        if value != self.table.value(index.row(), column):
+            self.edits[key] = value
+        else:
+            self.edits.pop(key, None)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self.message is None and not self.read_only:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return "Pesan" if self.message is not None else self.table.columns[section]
+        return str(section + 1)
+
+
+class ChangePreviewModel(QAbstractTableModel):
+    HEADERS = ("Row", "Column", "Old", "New")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.changes = []
+
+    def set_changes(self, changes):
+        self.beginResetModel()
+        self.changes = changes
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.changes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            row, column, old, new = self.changes[index.row()]
+            return (str(row + 1), column, old, new)[index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class BulkEditDialog(QDialog):
+    # Ubah banyak sel sekaligus di tabel yang sedang dibuka. Perubahan
+    # dihitung per kolom di core.bulk_edit dan ditampilkan lewat model
+    # pratinjau, lalu dikirim sebagai satu batch.
+    ROW_MODES = ("All rows", "Selected rows", "Rows where column matches")
+    OPERATIONS = ("Find and replace", "Set value", "Expression")
+
+    def __init__(self, data, columns, selected_rows, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Bulk Edit")
+        self.resize(800, 600)
+        self.data = data
+        self.selected_rows = selected_rows
+        self.changes = []
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.columns_input = QListWidget()
+        self.columns_input.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.columns_input.setMaximumHeight(120)
+        for name in data.columns:
+            item = QListWidgetItem(name)
+            self.columns_input.addItem(item)
+            item.setSelected(name in columns)
+        form.addRow("Columns:", self.columns_input)
+
+        self.rows_input = QComboBox()
+        self.rows_input.addItems(self.ROW_MODES)
+        self.rows_input.setCurrentIndex(1 if selected_rows else 0)
+        form.addRow("Rows:", self.rows_input)
+        filter_row = QHBoxLayout()
+        self.filter_column_input = QComboBox()
+        self.filter_column_input.addItems(data.columns)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("regular expression")
+        filter_row.addWidget(self.filter_column_input)
+        filter_row.addWidget(self.filter_input, 1)
+        form.addRow("Match:", filter_row)
+
+        self.operation_input = QComboBox()
+        self.operation_input.addItems(self.OPERATIONS)
+        form.addRow("Operation:", self.operation_input)
+        self.find_input = QLineEdit()
+        form.addRow("Find:", self.find_input)
+        self.replace_input = QLineEdit()
+        form.addRow("Replace with:", self.replace_input)
+        options_row = QHBoxLayout()
+        self.regex_input = QCheckBox("Regular expression")
+        self.regex_input.setChecked(True)
+        self.ignore_case_input = QCheckBox("Ignore case")
+        options_row.addWidget(self.regex_input)
+        options_row.addWidget(self.ignore_case_input)
+        options_row.addStretch(1)
+        form.addRow("", options_row)
+        self.value_input = QLineEdit()
+        form.addRow("Value:", self.value_input)
+        self.expression_input = QLineEdit()
+        self.expression_input.setPlaceholderText('value.replace("192.168.1.", "10.0.0.")  (also: row, get("Column"), re)')
+        form.addRow("Expression:", self.expression_input)
+        layout.addLayout(form)
+
+        self.summary_label = QLabel("Press Preview to see the affected cells")
+        layout.addWidget(self.summary_label)
+        self.preview_model = ChangePreviewModel(self)
+        self.preview_view = QTableView()
+        self.preview_view.setModel(self.preview_model)
+        self.preview_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.preview_view)
+
+        buttons = QHBoxLayout()
+        preview_btn = QPushButton("Preview")
+        preview_btn.clicked.connect(self.preview)
+        self.apply_btn = QPushButton("Apply and Save")
+        self.apply_btn.setEnabled(False)
+        self.apply_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        buttons.addWidget(preview_btn)
+        buttons.addStretch(1)
+        buttons.addWidget(self.apply_btn)
+        buttons.addWidget(cancel_btn)
+        layout.addLayout(buttons)
+
+        self.operation_input.currentIndexChanged.connect(self.update_inputs)
+        self.rows_input.currentIndexChanged.connect(self.update_inputs)
+        self.update_inputs()
+
+    def update_inputs(self):
+        operation = self.operation_input.currentText()
+        for widget, enabled in ((self.find_input, operation == "Find and replace"),
+                                (self.replace_input, operation == "Find and replace"),
+                                (self.regex_input, operation == "Find and replace"),
+                                (self.ignore_case_input, operation == "Find and replace"),
+                                (self.value_input, operation == "Set value"),
+                                (self.expression_input, operation == "Expression"),
+                                (self.filter_column_input, self.rows_input.currentIndex() == 2),
+                                (self.filter_input, self.rows_input.currentIndex() == 2)):
+            widget.setEnabled(enabled)
+        # Pratinjau lama tidak berlaku lagi setelah pilihan diubah
+        self.apply_btn.setEnabled(False)
+
+    def build_operation(self):
+        operation = self.operation_input.currentText()
+        if operation == "Find and replace":
+            if not self.find_input.text():
+                raise ValueError("Enter the text to find")
+            return replace_operation(self.find_input.text(), self.replace_input.text(),
+                                     self.regex_input.isChecked(), self.ignore_case_input.isChecked())
+        if operation == "Set value":
+            return set_operation(self.value_input.text())
+        if not self.expression_input.text().strip():
+            raise ValueError("Enter an expression")
+        return expression_operation(self.expression_input.text())
+
+    def build_rows(self):
+        mode = self.rows_input.currentIndex()
+        if mode == 0:
+            return None
+        if mode == 1:
+            return self.selected_rows
+        return match_rows(self.data, self.filter_column_input.currentText(), self.filter_input.text())
+
+    def preview(self):
+        columns = [item.text() for item in self.columns_input.selectedItems()]
+        if not columns:
+            QMessageBox.warning(self, "Warning", "Select at least one column")
+            return
+        try:
+            self.changes = bulk_edit(self.data, columns, self.build_rows(), self.build_operation())
+        except (ValueError, SyntaxError, re.error) as e:
+            QMessageBox.warning(self, "Warning", f"Invalid bulk edit: {str(e)}")
+            return
+        self.preview_model.set_changes(self.changes)
+        rows = len({row for row, _, _, _ in self.changes})
+        self.summary_label.setText(f"{len(self.changes)} cells in {rows} rows will change")
+        self.apply_btn.setEnabled(bool(self.changes))
+
+
+class FleetWorker(QObject):
+    host_status = Signal(int, str)
+    host_result = Signal(int, object)
+    finished = Signal(list)
+
+    start_run = Signal(list, object, int, int)
+
+    def __init__(self):
+        super().__init__()
+        self.cancelled = False
+        self.start_run.connect(self.run)
+
+    def run(self, targets, job, concurrency, retries):
+        self.cancelled = False
+        results = run_fleet(targets, job, concurrency=concurrency, retries=retries,
+                            on_status=self.host_status.emit,
+                            on_result=self.host_result.emit,
+                            cancelled=lambda: self.cancelled)
+        self.finished.emit(results)
+
+
+class FleetDialog(QDialog):
+    OPERATIONS = ("Read table", "Set value", "Run command")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Fleet Mode")
+        self.resize(900, 600)
+        self.targets = []
+        self.results = []
+        self.closing = False
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        targets_row = QHBoxLayout()
+        self.targets_label = QLabel("No targets loaded")
+        load_btn = QPushButton("Load Targets")
+        load_btn.clicked.connect(self.load_targets)
+        targets_row.addWidget(self.targets_label, 1)
+        targets_row.addWidget(load_btn)
+        form.addRow("Targets:", targets_row)
+
+        self.operation_input = QComboBox()
+        self.operation_input.addItems(self.OPERATIONS)
+        form.addRow("Operation:", self.operation_input)
+        self.table_input = QLineEdit()
+        form.addRow("Table:", self.table_input)
+        self.row_input = QSpinBox()
+        self.row_input.setRange(0, 100000)
+        form.addRow("Row:", self.row_input)
+        self.column_input = QLineEdit()
+        form.addRow("Column:", self.column_input)
+        self.value_input = QLineEdit()
+        form.addRow("Value:", self.value_input)
+        self.command_input = QLineEdit()
+        self.command_input.setPlaceholderText("sendcmd 1 DB p DevInfo")
+        form.addRow("Command:", self.command_input)
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 256)
+        self.concurrency_input.setValue(FLEET_CONCURRENCY)
+        form.addRow("Concurrent sessions:", self.concurrency_input)
+        self.retries_input = QSpinBox()
+        self.retries_input.setRange(0, 10)
+        self.retries_input.setValue(FLEET_RETRIES)
+        form.addRow("Retries:", self.retries_input)
+        layout.addLayout(form)
+
+        self.results_table = QTableWidget(0, 4)
+        self.results_table.setHorizontalHeaderLabels(["IP", "Status", "Attempts", "Detail"])
+        self.results_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.results_table)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        buttons = QHBoxLayout()
+        self.run_btn = QPushButton("Run")
+        self.run_btn.clicked.connect(self.run)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        export_btn = QPushButton("Export Results")
+        export_btn.clicked.connect(self.export_results)
+        buttons.addWidget(self.run_btn)
+        buttons.addWidget(self.cancel_btn)
+        buttons.addWidget(export_btn)
+        layout.addLayout(buttons)
+
+        self.worker = FleetWorker()
+        self.thread = QThread()
+        self.worker.moveToThread(self.thread)
+        self.worker.host_status.connect(self.handle_host_status)
+        self.worker.host_result.connect(self.handle_host_result)
+        self.worker.finished.connect(self.handle_finished)
+        self.thread.start()
+
+    def load_targets(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Load Targets", "", "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
+        )
+        if file_name:
+            try:
+                self.targets = load_fleet_targets(file_name)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to load targets: {str(e)}")
+                return
+            self.targets_label.setText(f"{len(self.targets)} modems from {file_name}")
+            self.results_table.setRowCount(len(self.targets))
+            for row, (ip, _, _) in enumerate(self.targets):
+                self.set_result_row(row, ip, "pending", "", "")
+
+    def build_job(self):
+        operation = self.operation_input.currentText()
+        table = self.table_input.text().strip()
+        if operation == "Read table":
+            if not table:
+                raise ValueError("Table name is required")
+            return fleet_read_table(table)
+        if operation == "Set value":
+            column = self.column_input.text().strip()
+            if not table or not column:
+                raise ValueError("Table and column are required")
+            return fleet_set_value(table, self.row_input.value(), column, self.value_input.text())
+        command = self.command_input.text().strip()
+        if not command:
+            raise ValueError("Command is required")
+        return fleet_command(command)
+
+    def run(self):
+        if not self.targets:
+            QMessageBox.warning(self, "Warning", "Load a target list first")
+            return
+        try:
+            job = self.build_job()
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", str(e))
+            return
+        self.results = []
+        for row, (ip, _, _) in enumerate(self.targets):
+            self.set_result_row(row, ip, "pending", "", "")
+        self.progress_bar.setMaximum(len(self.targets))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.run_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.worker.start_run.emit(self.targets, job, self.concurrency_input.value(),
+                                   self.retries_input.value())
+
+    def cancel(self):
+        self.worker.cancelled = True
+        self.cancel_btn.setEnabled(False)
+
+    def set_result_row(self, row, ip, status, attempts, detail):
+        for col, text in enumerate((ip, status, str(attempts), detail)):
+            self.results_table.setItem(row, col, QTableWidgetItem(text))
+
+    def handle_host_status(self, index, status):
+        self.results_table.setItem(index, 1, QTableWidgetItem(status))
+
+    def handle_host_result(self, index, result):
+        detail = result.get("error", "")
+        if result["status"] == "ok":
+            value = result["result"]
+            if isinstance(value, dict):
+                detail = f"{len(value['rows'])} rows"
+            else:
+                detail = str(value).strip().splitlines()[-1] if str(value).strip() else ""
+        self.set_result_row(index, result["ip"], result["status"], result["attempts"], detail)
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+
+    def handle_finished(self, results):
+        self.results = results
+        self.progress_bar.setVisible(False)
+        self.run_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        ok = sum(1 for result in results if result["status"] == "ok")
+        QMessageBox.information(self, "Fleet Mode", f"Finished: {ok} of {len(results)} modems succeeded")
+
+    def export_results(self):
+        if not self.results:
+            QMessageBox.warning(self, "Warning", "No results to export")
+            return
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Export Results", "", "JSON Files (*.json);;All Files (*)"
+        )
+        if file_name:
+            try:
+                with open(file_name, 'w') as f:
+                    json.dump(self.results, f, indent=2)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to export results: {str(e)}")
+
+    def done(self, result):
+        # Thread GUI tidak menunggu run_fleet: minta batal, lalu worker,
+        # thread dan dialog dihapus setelah sesi yang masih jalan selesai
+        if not self.closing:
+            self.closing = True
+            self.worker.cancelled = True
+            self.worker.host_status.disconnect(self.handle_host_status)
+            self.worker.host_result.disconnect(self.handle_host_result)
+            self.worker.finished.disconnect(self.handle_finished)
+            self.thread.finished.connect(self.worker.deleteLater)
+            self.thread.finished.connect(self.thread.deleteLater)
+            self.thread.finished.connect(self.deleteLater)
+            self.thread.quit()
+        super().done(result)
+
+
+METRICS_REFRESH_MS = 1000
+METRICS_RECENT = 200
+
+class MetricsPanel(QDockWidget):
+    def __init__(self, metrics, parent=None):
+        super().__init__("Command Metrics", parent)
+        self.setObjectName("metrics_panel")
+        self.metrics = metrics
+        
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        self.summary_table = QTableWidget(0, 10)
+        self.summary_table.setHorizontalHeaderLabels(
+            ["Type", "Count", "p50 ms", "p95 ms", "Max ms", "TTFB p50", "Read p50", "Parse p50", "Render p50", "Bytes"])
+        self.summary_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(QLabel("Latency per command type (send + read + parse + render):"))
+        layout.addWidget(self.summary_table)
+        
+        bounds = [f"<={bound}" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+        self.histogram_table = QTableWidget(0, len(bounds))
+        self.histogram_table.setHorizontalHeaderLabels(bounds)
+        self.histogram_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(QLabel("Latency histogram (ms):"))
+        layout.addWidget(self.histogram_table)
+        
+        self.recent_table = QTableWidget(0, 8)
+        self.recent_table.setHorizontalHeaderLabels(
+            ["Time", "Command", "Send ms", "TTFB ms", "Read ms", "Bytes", "Parse ms", "Render ms"])
+        self.recent_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.recent_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(QLabel(f"Last {METRICS_RECENT} commands:"))
+        layout.addWidget(self.recent_table)
+        
+        buttons = QHBoxLayout()
+        for text, slot in (("Export JSON", self.export_json), ("Export CSV", self.export_csv),
+                           ("Clear", self.clear)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+        self.setWidget(widget)
+        
+        # Hanya disegarkan selagi panel terlihat
+        self.timer = QTimer(self)
+        self.timer.setInterval(METRICS_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.handle_visibility)
+
+    def handle_visibility(self, visible):
+        if visible:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        summary = self.metrics.summary()
+        self.summary_table.setRowCount(len(summary))
+        self.histogram_table.setRowCount(len(summary))
+        self.histogram_table.setVerticalHeaderLabels(list(summary))
+        for row, (kind, stats) in enumerate(summary.items()):
+            values = [kind, str(stats["count"])] + [
+                f"{stats[key]:.1f}" for key in ("p50_ms", "p95_ms", "max_ms", "ttfb_p50_ms",
+                                                "read_p50_ms", "parse_p50_ms", "render_p50_ms")
+            ] + [str(stats["bytes"])]
+            for column, value in enumerate(values):
+                self.summary_table.setItem(row, column, QTableWidgetItem(value))
+            for column, count in enumerate(stats["histogram"]):
+                self.histogram_table.setItem(row, column, QTableWidgetItem(str(count) if count else ""))
+        
+        recent = self.metrics.records()[-METRICS_RECENT:][::-1]
+        self.recent_table.setRowCount(len(recent))
+        for row, entry in enumerate(recent):
+            values = [datetime.fromtimestamp(entry["timestamp"]).strftime("%H:%M:%S"), entry["command"]] + [
+                f"{entry[key] * 1000:.1f}" for key in ("send", "ttfb", "read")
+            ] + [str(entry["bytes"])] + [f"{entry[key] * 1000:.1f}" for key in ("parse", "render")]
+            for column, value in enumerate(values):
+                self.recent_table.setItem(row, column, QTableWidgetItem(value))
+
+    def export_json(self):
+        self.export("JSON Files (*.json);;All Files (*)", self.metrics.export_json)
+
+    def export_csv(self):
+        self.export("CSV Files (*.csv);;All Files (*)", self.metrics.export_csv)
+
+    def export(self, file_filter, write):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "", file_filter)
+        if file_name:
+            try:
+                write(file_name)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to export metrics: {str(e)}")
+
+    def clear(self):
+        self.metrics.clear()
+        self.refresh()
 
-    def disconnect(self):
-        if self.tn:
-            self.tn.close()
-            self.tn = None
 
 class TelnetClient(QMainWindow):
     def __init__(self):
         super().__init__()
         self.current_table = None
-        self.data_model = []
-        self.modified_data = {}
-        self.command_queue = []
+        self.table_model = DBTableModel()
+        self.table_cache = TableCache()
+        self.metrics = CommandMetrics()
+        self.stream_render = 0.0
+        self.value_index = ValueIndex()
+        self.usage = UsageStats()
+        self.device_cache = None
+        self.host = ""
+        self.watches = {}
+        self.prefetch_queue = []
+        self.prefetch_total = 0
+        self.prefetch_inflight = 0
+        self.prefetch_request = None
+        self.stream_data = None
+        self.fetch_request = None
+        self.list_request = None
+        self.batches = {}
+        self.keepalive_failures = 0
+        self.snapshot_file = None
+        self.changeset = None
         self.all_tables = []
         self.current_theme = 'dark'
         self.current_version = '1.0.0'
@@ -88,20 +1007,43 @@ class TelnetClient(QMainWindow):
         self.init_worker_thread()
         #self.setWindowIcon(QIcon("icon.png"))
 
-        pixmap = QPixmap()
-        byte_array = QByteArray.fromBase64(App_Icon.encode())
-        pixmap.loadFromData(byte_array, "PNG")
-        self.setWindowIcon(QIcon(pixmap))
+        self.setWindowIcon(QIcon(app_pixmap(256)))
 
     def init_worker_thread(self):
-        self.worker = Worker()
+        self.worker = Worker(metrics=self.metrics)
         self.thread = QThread()
         self.worker.moveToThread(self.thread)
         
         self.worker.connected.connect(self.handle_connected)
+        self.worker.identified.connect(self.handle_identified)
         self.worker.connect_error.connect(self.handle_connect_error)
         self.worker.command_output.connect(self.handle_command_output)
         self.worker.command_error.connect(self.handle_command_error)
+        self.worker.command_cancelled.connect(self.handle_command_cancelled)
+        self.worker.table_started.connect(self.handle_table_started)
+        self.worker.table_rows.connect(self.handle_table_rows)
+        self.worker.table_finished.connect(self.handle_table_finished)
+        self.worker.table_prefetched.connect(self.handle_table_prefetched)
+        self.worker.table_polled.connect(self.handle_table_polled)
+        self.worker.watch_failed.connect(self.handle_watch_failed)
+        self.worker.batch_progress.connect(self.handle_batch_progress)
+        self.worker.commit_finished.connect(self.handle_commit_finished)
+        self.worker.changes_checked.connect(self.handle_changes_checked)
+        self.worker.dump_progress.connect(self.handle_dump_progress)
+        self.worker.dump_finished.connect(self.handle_dump_finished)
+        self.worker.export_progress.connect(self.handle_export_progress)
+        self.worker.export_finished.connect(self.handle_export_finished)
+        self.worker.import_ready.connect(self.handle_import_ready)
+        self.worker.reconnected.connect(self.handle_reconnected)
+        self.worker.keepalive_failed.connect(self.handle_keepalive_failed)
+        
+        self.keepalive_timer = QTimer(self)
+        self.keepalive_timer.setInterval(int(KEEPALIVE_INTERVAL * 1000))
+        self.keepalive_timer.timeout.connect(self.send_keep_alive)
+        
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(self.usage.settings.get("watch_interval", WATCH_INTERVAL) * 1000)
+        self.watch_timer.timeout.connect(self.poll_watches)
         
         self.thread.start()
 
@@ -131,6 +1073,53 @@ class TelnetClient(QMainWindow):
         save_changes_action.triggered.connect(self.save_changes)
         file_menu.addAction(save_changes_action)
         
+        refresh_action = QAction("&Refresh Table", self)
+        refresh_action.setShortcut("F5")
+        refresh_action.triggered.connect(self.refresh_table)
+        file_menu.addAction(refresh_action)
+        
+        dump_action = QAction("&Dump Database...", self)
+        dump_action.triggered.connect(self.dump_database)
+        file_menu.addAction(dump_action)
+        
+        bulk_edit_action = QAction("&Bulk Edit...", self)
+        bulk_edit_action.setShortcut("Ctrl+H")
+        bulk_edit_action.triggered.connect(self.bulk_edit)
+        file_menu.addAction(bulk_edit_action)
+        
+        export_action = QAction("&Export Table...", self)
+        export_action.triggered.connect(self.export_table)
+        file_menu.addAction(export_action)
+        
+        import_action = QAction("&Import Table...", self)
+        import_action.triggered.connect(self.import_table)
+        file_menu.addAction(import_action)
+        
+        rollback_action = QAction("&Roll Back Commit...", self)
+        rollback_action.triggered.connect(self.rollback_commit)
+        file_menu.addAction(rollback_action)
+        
+        offline_action = QAction("&Open Snapshot Offline...", self)
+        offline_action.triggered.connect(self.open_snapshot)
+        file_menu.addAction(offline_action)
+        
+        push_action = QAction("&Push Change Set", self)
+        push_action.triggered.connect(self.push_change_set)
+        file_menu.addAction(push_action)
+        
+        diff_action = QAction("D&iff Snapshots...", self)
+        diff_action.triggered.connect(self.diff_snapshots)
+        file_menu.addAction(diff_action)
+        
+        cancel_action = QAction("&Cancel Operation", self)
+        cancel_action.setShortcut("Ctrl+.")
+        cancel_action.triggered.connect(self.cancel_operation)
+        file_menu.addAction(cancel_action)
+        
+        fleet_action = QAction("&Fleet Mode...", self)
+        fleet_action.triggered.connect(self.show_fleet)
+        file_menu.addAction(fleet_action)
+        
         exit_action = QAction("E&xit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -147,6 +1136,37 @@ class TelnetClient(QMainWindow):
         theme_action.triggered.connect(self.change_theme)
         settings_menu.addAction(theme_action)
         
+        self.prefetch_action = QAction("Background &Prefetch", self)
+        self.prefetch_action.setCheckable(True)
+        self.prefetch_action.setChecked(self.usage.settings.get("prefetch", True))
+        self.prefetch_action.triggered.connect(self.toggle_prefetch)
+        settings_menu.addAction(self.prefetch_action)
+        
+        self.disk_cache_action = QAction("Cache Tables on &Disk", self)
+        self.disk_cache_action.setCheckable(True)
+        self.disk_cache_action.setChecked(self.usage.settings.get("disk_cache", False))
+        self.disk_cache_action.triggered.connect(self.toggle_disk_cache)
+        settings_menu.addAction(self.disk_cache_action)
+        
+        budget_action = QAction("Prefetch &Budget...", self)
+        budget_action.triggered.connect(self.set_prefetch_budget)
+        settings_menu.addAction(budget_action)
+        
+        sessions_action = QAction("Parallel &Sessions...", self)
+        sessions_action.triggered.connect(self.set_sessions)
+        settings_menu.addAction(sessions_action)
+        
+        watch_interval_action = QAction("&Watch Interval...", self)
+        watch_interval_action.triggered.connect(self.set_watch_interval)
+        settings_menu.addAction(watch_interval_action)
+        
+        self.metrics_panel = MetricsPanel(self.metrics, self)
+        self.metrics_panel.setVisible(False)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.metrics_panel)
+        metrics_action = self.metrics_panel.toggleViewAction()
+        metrics_action.setText("Command &Metrics Panel")
+        settings_menu.addAction(metrics_action)
+        
         # Menu Help
         help_menu = menubar.addMenu("&Help")
         help_action = QAction("&Usage Guide", self)
@@ -185,8 +1205,11 @@ class TelnetClient(QMainWindow):
         form_layout.addWidget(self.pass_input)
         form_layout.addWidget(self.connect_btn)
 
-        self.tables_list = QListWidget()
-        self.tables_list.itemClicked.connect(self.load_table_data)
+        self.tables_model = TableListModel()
+        self.tables_list = QListView()
+        self.tables_list.setModel(self.tables_model)
+        self.tables_list.setUniformItemSizes(True)
+        self.tables_list.clicked.connect(self.load_table_data)
         
         left_layout.addWidget(connection_form)
         left_layout.addWidget(QLabel("Available Tables:"))
@@ -195,14 +1218,18 @@ class TelnetClient(QMainWindow):
         self.search_input.setPlaceholderText("Search tables...")
         left_layout.addWidget(self.search_input)
         
-        self.completer_model = QStringListModel()
+        # Completer memakai model yang sama dan tidak menyaring ulang
         self.completer = QCompleter()
-        self.completer.setModel(self.completer_model)
-        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
-        self.completer.setFilterMode(Qt.MatchContains)
+        self.completer.setModel(self.tables_model)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
         self.search_input.setCompleter(self.completer)
         
-        self.search_input.textChanged.connect(self.filter_tables)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_tables)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_input.returnPressed.connect(self.filter_tables)
         
         left_layout.addWidget(self.tables_list)
         
@@ -210,12 +1237,32 @@ class TelnetClient(QMainWindow):
         right_layout = QVBoxLayout(right_panel)
         
         self.current_table_label = QLabel("Selected Table: None")
-        right_layout.addWidget(self.current_table_label)
+        self.watch_btn = QPushButton("Watch")
+        self.watch_btn.setCheckable(True)
+        self.watch_btn.setToolTip("Poll this table periodically and highlight changed cells")
+        self.watch_btn.clicked.connect(self.toggle_watch)
+        table_header = QHBoxLayout()
+        table_header.addWidget(self.current_table_label, 1)
+        table_header.addWidget(self.watch_btn)
+        right_layout.addLayout(table_header)
         
-        self.table_widget = QTableWidget()
-        self.table_widget.itemChanged.connect(self.handle_item_changed)
-        self.table_widget.setEditTriggers(QTableWidget.DoubleClicked)
-        right_layout.addWidget(self.table_widget)
+        self.value_search_input = QLineEdit()
+        self.value_search_input.setPlaceholderText("Search values in all tables (SSID, VLAN, MAC...)")
+        self.value_search_input.returnPressed.connect(self.search_values)
+        right_layout.addWidget(self.value_search_input)
+        
+        self.value_results = QListWidget()
+        self.value_results.setMaximumHeight(150)
+        self.value_results.setVisible(False)
+        self.value_results.itemActivated.connect(self.jump_to_value)
+        self.value_results.itemClicked.connect(self.jump_to_value)
+        right_layout.addWidget(self.value_results)
+        
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setEditTriggers(QTableView.DoubleClicked)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        right_layout.addWidget(self.table_view)
         
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -238,7 +1285,7 @@ class TelnetClient(QMainWindow):
                     color: #ffffff;
                     font-size: 12px;
                 }
-                QLineEdit, QListWidget, QTableWidget {
+                QLineEdit, QListView, QTableView {
                     background-color: #3c3f41;
                     border: 1px solid #555555;
                     padding: 5px;
@@ -302,7 +1349,7 @@ class TelnetClient(QMainWindow):
                     color: #333333;
                     font-size: 12px;
                 }
-                QLineEdit, QListWidget, QTableWidget {
+                QLineEdit, QListView, QTableView {
                     background-color: #ffffff;
                     border: 1px solid #cccccc;
                     padding: 5px;
@@ -413,16 +1460,15 @@ class TelnetClient(QMainWindow):
 
     # Fungsi untuk menu Help dan About
     def show_help(self):
+        self.help_box().exec()
+
+    def help_box(self):
         msg_box = QMessageBox(self)
-        msg_box.setIcon(QMessageBox.Information)
+        msg_box.setIconPixmap(app_pixmap(100))
         msg_box.setWindowTitle("Help")
         
-        # Format Base64 sebagai data URI untuk HTML
-        icon_base64_html = f'<img src="data:image/png;base64,{App_Icon}" width="32" height="32">'
-        
         msg_box.setText(f"""
             <div style="text-align: center;">
-                <img src="data:image/png;base64,{App_Icon}" width="100" height="100">
                 <h2>Help and Instructions</h2>
             </div>
             <p><b>Z-DBEdit</b> is a GUI tool for managing database configurations on ZTE modems via Telnet.</p>
@@ -450,18 +1496,18 @@ class TelnetClient(QMainWindow):
             <p><b>Version:</b> {self.current_version}</p>
             <p>© {datetime.now().year} Arif Maulana Azis</p>
         """)
-        msg_box.exec()
+        return msg_box
 
     def show_about(self):
+        self.about_box().exec()
+
+    def about_box(self):
         msg_box = QMessageBox(self)
-        msg_box.setIcon(QMessageBox.Information)
+        msg_box.setIconPixmap(app_pixmap(100))
         msg_box.setWindowTitle("About")
         
-        icon_base64_html = f'<img src="data:image/png;base64,{App_Icon}" width="32" height="32">'
-        
         msg_box.setText(f"""
             <div style="text-align: center;">
-                <img src="data:image/png;base64,{App_Icon}" width="100" height="100">
                 <h2>About Z-DBEdit</h2>
             </div>
             <p><b>Z-DBEdit</b> is a database editing tool designed for ZTE modems using Telnet.</p>
@@ -470,145 +1516,789 @@ class TelnetClient(QMainWindow):
             <p><b>Version:</b> {self.current_version}</p>
             <p>© {datetime.now().year} Arif Maulana Azis</p>
         """)
+        return msg_box
+
+    def dump_database(self):
+        if not self.all_tables:
+            QMessageBox.warning(self, "Warning", "Connect to the modem first")
+            return
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Dump Database", "", "SQLite Files (*.db);;All Files (*)"
+        )
+        if file_name:
+            self.progress_bar.setMaximum(len(self.all_tables))
+            self.progress_bar.setValue(0)
+            self.progress_bar.setVisible(True)
+            self.worker.request("dump", file_name, self.all_tables, priority=PRIORITY_BACKGROUND, key=file_name)
+
+    def handle_dump_progress(self, done, total):
+        self.progress_bar.setValue(done)
+
+    def handle_dump_finished(self, request_id, file_name, count):
+        self.progress_bar.setVisible(False)
+        QMessageBox.information(self, "Success", f"{count} tables saved to {file_name}")
+
+    def bulk_edit(self):
+        model = self.table_model
+        if model.message is not None or model.read_only or not model.table.columns:
+            QMessageBox.warning(self, "Warning", "Open a table first")
+            return
+        selection = self.table_view.selectionModel().selectedIndexes()
+        rows = sorted({index.row() for index in selection})
+        columns = {model.table.columns[index.column()] for index in selection}
+        dialog = BulkEditDialog(model.effective_table(), columns, rows, self)
+        if dialog.exec() == QDialog.Accepted and dialog.changes:
+            model.apply_edits(dialog.changes)
+            if self.snapshot_file:
+                self.queue_changes()
+                return
+            # Hanya sel dari dialog yang dikirim; edit manual lain tetap tertunda
+            cells = {(row, column) for row, column, _, _ in dialog.changes}
+            edits = {key: value for key, value in model.edits.items() if key in cells}
+            if edits:
+                self.commit_table_edits(edits)
+
+    def choose_table(self, title):
+        if not self.all_tables:
+            QMessageBox.warning(self, "Warning", "Connect to the modem first")
+            return None
+        current = self.all_tables.index(self.current_table) if self.current_table in self.all_tables else 0
+        table, ok = QInputDialog.getItem(self, title, "Table:", self.all_tables, current, True)
+        return table if ok and table else None
+
+    def export_table(self):
+        table = self.choose_table("Export Table")
+        if not table:
+            return
+        file_name, file_filter = QFileDialog.getSaveFileName(
+            self, "Export Table", f"{table}.csv", "CSV Files (*.csv);;JSON Lines Files (*.jsonl)"
+        )
+        if not file_name:
+            return
+        if not os.path.splitext(file_name)[1]:
+            file_name += ".jsonl" if "jsonl" in file_filter else ".csv"
+        self.worker.request("export", table, file_name, key=file_name)
+        self.statusBar().showMessage(f"Exporting {table}...")
+
+    def handle_export_progress(self, request_id, rows):
+        self.statusBar().showMessage(f"Exporting: {rows} rows written")
+
+    def handle_export_finished(self, request_id, table, file_name, rows):
+        self.statusBar().clearMessage()
+        QMessageBox.information(self, "Success", f"{rows} rows of {table} exported to {file_name}")
+
+    def import_table(self):
+        table = self.choose_table("Import Table")
+        if not table:
+            return
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Import Table", "", "Table Files (*.csv *.jsonl *.ndjson *.json);;All Files (*)"
+        )
+        if file_name:
+            self.worker.request("import", table, file_name, key=file_name)
+            self.statusBar().showMessage(f"Comparing {file_name} with {table}...")
+
+    def handle_import_ready(self, request_id, table, file_name, changes, problems):
+        self.statusBar().clearMessage()
+        notes = []
+        if problems["missing_rows"]:
+            notes.append(f"{len(problems['missing_rows'])} rows not in the table were skipped")
+        if problems["unknown_columns"]:
+            notes.append(f"Unknown columns were skipped: {', '.join(problems['unknown_columns'])}")
+        if not changes:
+            QMessageBox.information(self, "Import", "\n".join(["No differences with the modem."] + notes))
+            return
+        rows = len({row for row, _, _, _ in changes})
+        text = f"{len(changes)} cells in {rows} rows of {table} differ from the modem. Apply them as one batch?"
+        if table == self.current_table and self.table_model.edits:
+            notes.append("Unsaved edits in this table will be discarded.")
+        if QMessageBox.question(self, "Import", "\n\n".join([text] + notes)) != QMessageBox.Yes:
+            return
+        self.table_cache.invalidate(table)
+        self.value_index.remove_table(table)
+        if self.device_cache:
+            self.device_cache.invalidate_table(table)
+        self.start_commit(import_changes(table, changes), {"import": True})
+
+    def diff_snapshots(self):
+        old_file, _ = QFileDialog.getOpenFileName(
+            self, "Old Snapshot", "", "SQLite Files (*.db);;All Files (*)"
+        )
+        if not old_file:
+            return
+        new_file, _ = QFileDialog.getOpenFileName(
+            self, "New Snapshot", "", "SQLite Files (*.db);;All Files (*)"
+        )
+        if not new_file:
+            return
+        try:
+            diff = diff_snapshots(old_file, new_file)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to compare snapshots: {str(e)}")
+            return
+
+        lines = []
+        for name in diff["added_tables"]:
+            lines.append(f"+ table {name}")
+        for name in diff["removed_tables"]:
+            lines.append(f"- table {name}")
+        cells = 0
+        for name, table in diff["tables"].items():
+            for row in table["added_rows"]:
+                lines.append(f"+ {name} row {row}")
+            for row in table["removed_rows"]:
+                lines.append(f"- {name} row {row}")
+            for change in table["changes"]:
+                lines.append(f"~ {name} row {change['row']} {change['column']}: "
+                             f"\"{change['old']}\" -> \"{change['new']}\"")
+            cells += len(table["changes"])
+
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(QMessageBox.Information)
+        msg_box.setWindowTitle("Snapshot Diff")
+        msg_box.setText(f"{len(diff['tables'])} tables differ, {cells} cells changed, "
+                        f"{len(diff['added_tables'])} tables added, "
+                        f"{len(diff['removed_tables'])} tables removed")
+        if lines:
+            msg_box.setDetailedText("\n".join(lines))
         msg_box.exec()
 
+    def show_fleet(self):
+        dialog = FleetDialog(self)
+        dialog.exec()
+
     def initiate_connection(self):
         ip = self.ip_input.text()
         user = self.user_input.text()
         password = self.pass_input.text()
         self.connect_btn.setEnabled(False)
-        self.worker.start_connect.emit(ip, user, password)
+        self.host = ip
+        self.worker.scheduler.clear()
+        self.worker.request("connect", ip, user, password, self.usage.settings.get("sessions", 1),
+                            priority=PRIORITY_CONTROL)
 
-    def handle_connected(self):
+    def handle_connected(self, request_id):
         self.connect_btn.setEnabled(True)
-        QMessageBox.information(self, "Success", "Connected successfully!")
-        self.worker.start_command.emit("sendcmd 1 DB all")
+        self.reset_keep_alive()
+        sessions = self.worker.session.parallelism
+        QMessageBox.information(self, "Success", "Connected successfully!" if sessions == 1 else
+                                f"Connected successfully! ({sessions} parallel sessions)")
+        self.table_cache.clear()
+        # Daftar tabel dari cache disk perangkat terakhir di alamat ini
+        # langsung ditampilkan, lalu divalidasi dengan identitas dan "DB all"
+        self.device_cache = DeviceCache.for_host(self.host)
+        if self.device_cache and self.device_cache.tables:
+            self.show_table_list(self.device_cache.tables)
+            self.statusBar().showMessage("Table list loaded from cache, refreshing...")
+        pending = pending_journals(self.host)
+        if pending:
+            self.statusBar().showMessage(f"{len(pending)} interrupted commits to this modem can be rolled back "
+                                         "with File > Roll Back Commit...")
+        self.worker.request("identify", key="identify")
+        self.list_request = self.worker.request("command", "sendcmd 1 DB all", key="sendcmd 1 DB all")
+        if self.snapshot_file:
+            # Keluar dari mode offline: tabel yang tampil diambil dari modem
+            self.snapshot_file = None
+            if self.current_table:
+                self.open_table(self.current_table)
+        if self.changeset:
+            text = f"{len(self.changeset)} changes prepared offline are queued. Check and push them now?"
+            if self.changeset.host and self.changeset.host != self.host:
+                text += f"\n\nThe snapshot was taken from {self.changeset.host}, not from {self.host}."
+            if QMessageBox.question(self, "Push Change Set", text) == QMessageBox.Yes:
+                self.push_change_set()
+
+    def handle_identified(self, request_id, info):
+        key = device_key(info)
+        if key is None:
+            self.device_cache = None
+            return
+        if self.device_cache is None or self.device_cache.key != key:
+            # Perangkat lain (atau firmware baru) di alamat yang sama
+            self.device_cache = DeviceCache(key)
+            if self.list_request is not None:
+                self.show_table_list(self.device_cache.tables)
+        self.device_cache.remember(self.host, info)
+
+    def show_table_list(self, tables):
+        if tables != self.all_tables:
+            self.all_tables = tables
+            self.tables_model.set_tables(tables, self.search_input.text())
+
+    def send_keep_alive(self):
+        # Hanya saat sesi diam; perintah lain sudah cukup menjaga koneksi
+        if self.worker.scheduler.idle():
+            self.worker.request("keepalive", priority=PRIORITY_BACKGROUND, key="keepalive", preemptible=True)
+
+    def handle_reconnected(self):
+        self.reset_keep_alive()
+        self.statusBar().showMessage("Connection to the modem was lost and has been restored", 10000)
 
-    def handle_connect_error(self, error):
+    def reset_keep_alive(self):
+        self.keepalive_failures = 0
+        self.keepalive_timer.setInterval(int(KEEPALIVE_INTERVAL * 1000))
+        self.keepalive_timer.start()
+
+    def handle_keepalive_failed(self, request_id, error):
+        # Modem mungkin masih reboot: tanpa dialog, sambung ulang dicoba lagi
+        # dengan jeda yang makin panjang sampai berhasil
+        self.keepalive_failures += 1
+        delay = min(KEEPALIVE_RETRY_DELAY * 2 ** (self.keepalive_failures - 1), KEEPALIVE_MAX_DELAY)
+        self.keepalive_timer.stop()
+        self.keepalive_timer.setInterval(int(delay * 1000))
+        self.keepalive_timer.start()
+        self.statusBar().showMessage(f"Connection to the modem lost ({error}), retrying in {delay:.0f} s")
+
+    def handle_connect_error(self, request_id, error):
         self.connect_btn.setEnabled(True)
         QMessageBox.critical(self, "Error", f"Connection failed: {error}")
 
-    def handle_command_output(self, command, output):
-        if command == "sendcmd 1 DB all":
-            tables = re.findall(r"\d+\s+(\S+)", output)
-            self.all_tables = tables
-            self.completer_model.setStringList(tables)
-            self.tables_list.clear()
-            self.tables_list.addItems(tables)
+    def handle_command_output(self, request_id, command, output):
+        start = time.perf_counter()
+        parse = 0.0
+        if request_id == self.list_request:
+            tables = parse_table_list(output)
+            parse = time.perf_counter() - start
+            self.list_request = None
+            self.show_table_list(tables)
+            self.statusBar().clearMessage()
+            if self.device_cache:
+                self.device_cache.set_tables(tables)
+                self.save_device_cache()
+            self.start_prefetch(tables)
         elif command.startswith("sendcmd 1 DB p"):
             self.parse_table_data(output)
-        elif command.startswith("sendcmd 1 DB set"):
-            self.worker.start_command.emit("sendcmd 1 DB save")
-        elif command == "sendcmd 1 DB save":
-            self.progress_bar.setValue(self.progress_bar.value() + 1)
-            self.process_next_modification()
-
-    def filter_tables(self, text):
-        filtered = [table for table in self.all_tables 
-                   if text.lower() in table.lower()]
-        self.tables_list.clear()
-        self.tables_list.addItems(filtered)
-
-    def handle_command_error(self, command, error):
+        self.metrics.annotate(command, parse=parse, render=time.perf_counter() - start - parse)
+
+    def start_prefetch(self, tables):
+        # Ambil semua tabel di latar belakang untuk cache dan indeks nilai,
+        # yang paling sering/baru dipakai dulu. Satu tabel per sesi tiap giliran, dan
+        # fetch yang sedang jalan mengalah pada perintah interaktif.
+        self.value_index = ValueIndex()
+        self.prefetch_inflight = 0
+        self.prefetch_request = None
+        if not self.prefetch_action.isChecked():
+            self.prefetch_queue = []
+            return
+        self.prefetch_queue = self.usage.rank(tables)
+        self.prefetch_total = len(tables)
+        self.prefetch_next()
+
+    def prefetch_next(self):
+        if self.prefetch_inflight:
+            return
+        batch = []
+        while self.prefetch_queue and len(batch) < self.worker.session.parallelism:
+            table = self.prefetch_queue.pop(0)
+            cached = self.table_cache.get(table)
+            if cached is None:
+                batch.append(table)
+            else:
+                self.value_index.index_table(table, cached)
+        if batch:
+            self.prefetch_inflight = len(batch)
+            self.prefetch_request = self.worker.request("prefetch", batch, priority=PRIORITY_BACKGROUND, key=batch[0],
+                                preemptible=True)
+            return
+        if self.prefetch_total:
+            self.save_device_cache()
+            self.statusBar().showMessage(f"Prefetch done, value index ready: {len(self.value_index.tables)} tables", 5000)
+            self.prefetch_total = 0
+
+    def handle_table_prefetched(self, request_id, table, data, elapsed):
+        if data is not None:
+            self.value_index.index_table(table, data)
+            self.store_table(table, data)
+            # Tabel prefetch tidak boleh menggusur tabel yang dibuka pengguna
+            if self.table_cache.get(table) is None and self.table_cache.fits(data):
+                self.table_cache.put(table, data)
+        if request_id != self.prefetch_request:
+            return
+        self.prefetch_inflight -= 1
+        done = self.prefetch_total - len(self.prefetch_queue) - self.prefetch_inflight
+        self.statusBar().showMessage(f"Prefetching tables: {done}/{self.prefetch_total}")
+        if not self.prefetch_inflight:
+            # Batasi beban modem: jeda sebanding dengan lama fetch terakhir
+            budget = self.usage.settings.get("prefetch_budget", PREFETCH_BUDGET) / 100
+            QTimer.singleShot(int(elapsed * (1 - budget) / budget * 1000), self.prefetch_next)
+
+    def toggle_prefetch(self, checked):
+        self.usage.settings["prefetch"] = checked
+        self.save_usage()
+        if checked and self.all_tables:
+            self.start_prefetch(self.all_tables)
+        elif not checked:
+            self.prefetch_queue = []
+
+    def toggle_disk_cache(self, checked):
+        self.usage.settings["disk_cache"] = checked
+        self.save_usage()
+
+    def store_table(self, table, data):
+        # Skema selalu dicatat; isi tabel hanya bila cache disk diaktifkan
+        if self.device_cache is None:
+            return
+        self.device_cache.set_schema(table, data.columns)
+        if self.disk_cache_action.isChecked():
+            try:
+                self.device_cache.save_table(table, data)
+            except OSError as e:
+                self.statusBar().showMessage(f"Failed to cache table {table}: {str(e)}", 5000)
+
+    def save_device_cache(self):
+        if self.device_cache:
+            try:
+                self.device_cache.save()
+            except OSError as e:
+                self.statusBar().showMessage(f"Failed to save device cache: {str(e)}", 5000)
+
+    def set_prefetch_budget(self):
+        budget, ok = QInputDialog.getInt(
+            self, "Prefetch Budget", "Share of modem time background prefetch may use (%):",
+            self.usage.settings.get("prefetch_budget", PREFETCH_BUDGET), 5, 100)
+        if ok:
+            self.usage.settings["prefetch_budget"] = budget
+            self.save_usage()
+
+    def toggle_watch(self, checked):
+        table = self.current_table
+        if not table or self.snapshot_file:
+            self.watch_btn.setChecked(False)
+            return
+        if checked:
+            self.watches[table] = None
+            self.watch_timer.start()
+            self.poll_watches()
+        else:
+            self.watches.pop(table, None)
+            if not self.watches:
+                self.watch_timer.stop()
+                self.table_model.clear_highlights()
+
+    def set_sessions(self):
+        sessions, ok = QInputDialog.getInt(
+            self, "Parallel Sessions",
+            "Telnet sessions for bulk reads (dump, prefetch); used from the next connect.\n"
+            "The modem may accept fewer, writes always use one session:",
+            self.usage.settings.get("sessions", 1), 1, POOL_MAX_SESSIONS)
+        if ok:
+            self.usage.settings["sessions"] = sessions
+            self.save_usage()
+
+    def set_watch_interval(self):
+        interval, ok = QInputDialog.getInt(
+            self, "Watch Interval", "Seconds between polls of watched tables:",
+            self.usage.settings.get("watch_interval", WATCH_INTERVAL), 1, 3600)
+        if ok:
+            self.usage.settings["watch_interval"] = interval
+            self.watch_timer.setInterval(interval * 1000)
+            self.save_usage()
+
+    def poll_watches(self):
+        # Tanda perubahan bertahan satu interval
+        self.table_model.clear_highlights()
+        for table, digest in self.watches.items():
+            self.worker.request("watch", table, digest, priority=PRIORITY_BACKGROUND,
+                                key=table, preemptible=True)
+
+    def handle_table_polled(self, request_id, table, digest, data):
+        if table not in self.watches:
+            return
+        self.watches[table] = digest
+        if data is None:
+            # Output sama persis dengan poll sebelumnya, tidak perlu di-parse
+            return
+        model = self.table_model
+        on_view = (table == self.current_table and model.message is None and not model.read_only
+                   and model.table is not self.stream_data)
+        previous = model.table if on_view else self.table_cache.get(table)
+        if on_view:
+            changes = model.apply_table(data)
+        else:
+            changes = diff_tables(previous, data) if previous is not None else None
+            if changes is not None:
+                changes = [(row, column, previous.value(row, column), data.value(row, column))
+                           for row, column in changes]
+            if table == self.current_table and model.message is not None and not self.table_is_empty(data):
+                self.show_table(data)
+        # Indeks nilai cukup diperbarui per sel bila isinya versi sebelumnya
+        if (changes is not None and self.value_index.tables.get(table) is previous
+                and previous.row_count == data.row_count):
+            for row, column, old, new in changes:
+                self.value_index.update_cell(table, row, column, old, new)
+            self.value_index.tables[table] = data
+        else:
+            self.value_index.index_table(table, data)
+        self.table_cache.put(table, data)
+
+    def handle_watch_failed(self, request_id, table, error):
+        self.statusBar().showMessage(f"Watch of {table} failed: {error}", 5000)
+
+    def save_usage(self):
+        try:
+            self.usage.save()
+        except OSError as e:
+            self.statusBar().showMessage(f"Failed to save usage statistics: {str(e)}", 5000)
+
+    def search_values(self):
+        query = self.value_search_input.text()
+        self.value_results.clear()
+        if not query.strip():
+            self.value_results.setVisible(False)
+            return
+        hits = self.value_index.search(query)
+        for table, row, column, value in hits:
+            item = QListWidgetItem(f"{table}  row {row}  {column} = {value}")
+            item.setData(Qt.UserRole, (table, row, column))
+            self.value_results.addItem(item)
+        if not hits:
+            pending = " (prefetch still running)" if self.prefetch_queue else ""
+            self.value_results.addItem(f"No matches{pending}")
+        self.value_results.setVisible(True)
+
+    def jump_to_value(self, item):
+        hit = item.data(Qt.UserRole)
+        if not hit:
+            return
+        table, row, column = hit
+        if table != self.current_table:
+            # Data tabel sudah ada di indeks, jadi tidak perlu fetch ulang
+            if self.table_cache.get(table) is None and table in self.value_index.tables:
+                self.table_cache.put(table, self.value_index.tables[table])
+            self.open_table(table)
+        data = self.table_model.table
+        if column in data.values and row < data.row_count:
+            index = self.table_model.index(row, data.columns.index(column))
+            self.table_view.setCurrentIndex(index)
+            self.table_view.scrollTo(index)
+
+    def filter_tables(self):
+        self.search_timer.stop()
+        self.tables_model.set_filter(self.search_input.text())
+
+    def handle_command_error(self, request_id, command, error):
+        self.batches.pop(request_id, None)
         self.progress_bar.setVisible(False)
         QMessageBox.critical(self, "Error", f"Command '{command}' failed: {error}")
-        if self.command_queue:
-            self.command_queue = []
-            self.modified_data.clear()
 
-    def load_table_data(self, item):
-        self.current_table = item.text()
+    def cancel_operation(self):
+        # Dipanggil dari thread GUI; sesi membatalkan pembacaan yang sedang
+        # berjalan di thread worker. Pengindeksan latar belakang ikut berhenti.
+        self.prefetch_queue = []
+        self.worker.session.cancel()
+
+    def handle_command_cancelled(self, request_id, command):
+        self.batches.pop(request_id, None)
+        self.progress_bar.setVisible(False)
+        self.statusBar().showMessage(f"Cancelled: {command}", 5000)
+
+    def load_table_data(self, index):
+        self.open_table(index.data())
+
+    def open_table(self, table):
+        self.usage.record(table)
+        self.current_table = table
         self.current_table_label.setText(f"Selected Table: {self.current_table}")
-        self.worker.start_command.emit(f"sendcmd 1 DB p {self.current_table}")
+        self.watch_btn.setChecked(table in self.watches)
+        if self.snapshot_file:
+            self.open_offline_table(table)
+            return
+        cached = self.table_cache.get(self.current_table)
+        if cached is not None:
+            # Fetch tabel lain yang masih antre atau berjalan tidak diperlukan lagi
+            if self.fetch_request is not None:
+                self.worker.scheduler.cancel(self.fetch_request)
+                self.fetch_request = None
+            self.show_table(cached)
+            return
+        stored = None
+        if self.device_cache and self.disk_cache_action.isChecked():
+            stored = self.device_cache.load_table(table)
+        if stored:
+            # Salinan dari disk tampil dulu (hanya baca) sampai fetch selesai
+            data, timestamp = stored
+            self.show_table(data, read_only=True)
+            saved = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+            self.statusBar().showMessage(f"Showing cached copy from {saved}, refreshing...")
+        elif self.table_model.read_only:
+            # Jangan biarkan salinan tabel lain tampil selama fetch
+            self.table_model.set_table(TableData())
+        self.fetch_table(self.current_table)
 
-    def parse_table_data(self, output):
-        rows = re.findall(r'<Row No="(\d+)">(.*?)</Row>', output, re.DOTALL)
-        columns = set()
-        self.data_model = []
-        
-        if not rows or (len(rows) == 1 and rows[0][0] == "0" and not rows[0][1].strip()):
-            self.table_widget.clear()
-            self.table_widget.setRowCount(1)
-            self.table_widget.setColumnCount(1)
-            self.table_widget.setHorizontalHeaderLabels(["Pesan"])
-            item = QTableWidgetItem("There is no data in this table")
-            item.setTextAlignment(Qt.AlignCenter)
-            self.table_widget.setItem(0, 0, item)
-            return
-
-        for row in rows:
-            row_data = {}
-            fields = re.findall(r'<DM name="(.*?)" val="(.*?)"', row[1])
-            for field in fields:
-                row_data[field[0]] = field[1]
-                columns.add(field[0])
-            self.data_model.append(row_data)
-
-        columns = sorted(columns)
-        self.table_widget.clear()
-        self.table_widget.setRowCount(len(self.data_model))
-        self.table_widget.setColumnCount(len(columns))
-        self.table_widget.setHorizontalHeaderLabels(columns)
-
-        for row_idx, row_data in enumerate(self.data_model):
-            for col_idx, col_name in enumerate(columns):
-                item = QTableWidgetItem(row_data.get(col_name, ""))
-                item.setData(Qt.UserRole, (row_idx, col_name))
-                self.table_widget.setItem(row_idx, col_idx, item)
-
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-    def handle_item_changed(self, item):
-        if not item or not item.data(Qt.UserRole):
-            return
-        row_idx, col_name = item.data(Qt.UserRole)
-        original_value = self.data_model[row_idx].get(col_name, "")
-        if item.text() != original_value:
-            self.modified_data[(row_idx, col_name)] = item.text()
+    def open_offline_table(self, table):
+        try:
+            data = read_snapshot_table(self.snapshot_file, table)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to read {table} from the snapshot: {str(e)}")
+            return
+        self.show_table(data)
+        # Perubahan yang sudah antre tampil sebagai edit
+        edits = self.changeset.table_edits(table)
+        if edits and self.table_model.message is None:
+            self.table_model.apply_edits([(row, column, None, value) for (row, column), value in edits.items()])
+
+    def fetch_table(self, table):
+        # Fetch tampilan selalu menang atas pekerjaan latar belakang, dan
+        # menggantikan fetch tampilan sebelumnya (group "view")
+        self.fetch_request = self.worker.request("fetch", table, key=table, group="view")
+
+    def refresh_table(self):
+        if self.current_table and self.snapshot_file:
+            self.open_offline_table(self.current_table)
+        elif self.current_table:
+            self.table_cache.invalidate(self.current_table)
+            self.fetch_table(self.current_table)
+
+    def show_table(self, table, read_only=False):
+        if self.table_is_empty(table):
+            self.table_model.set_message("There is no data in this table")
         else:
-            self.modified_data.pop((row_idx, col_name), None)
+            self.table_model.set_table(table, read_only)
+
+    def handle_table_started(self, request_id, table):
+        self.stream_render = 0.0
+        if request_id == self.fetch_request:
+            # Kolom dari cache skema langsung jadi header tabel
+            schema = self.device_cache.schemas.get(table, ()) if self.device_cache else ()
+            self.stream_data = TableData(schema)
+            if not self.table_model.read_only:
+                self.table_model.set_table(self.stream_data)
+
+    def is_streaming(self, request_id):
+        # Abaikan baris fetch lama bila tampilan sudah diganti tabel lain
+        return request_id == self.fetch_request and (self.table_model.table is self.stream_data
+                                                     or self.table_model.read_only)
+
+    def handle_table_rows(self, request_id, table, rows):
+        if self.is_streaming(request_id):
+            start = time.perf_counter()
+            if self.table_model.table is self.stream_data:
+                self.table_model.append_rows(rows)
+            else:
+                # Salinan disk masih tampil; ganti sekaligus saat selesai
+                self.stream_data.extend(rows)
+            self.stream_render += time.perf_counter() - start
+
+    def handle_table_finished(self, request_id, table):
+        self.metrics.annotate(f"sendcmd 1 DB p {table}", render=self.stream_render)
+        if self.is_streaming(request_id):
+            if self.table_model.table is self.stream_data:
+                self.table_model.prune_columns()
+            else:
+                self.stream_data.prune_columns()
+                self.show_table(self.stream_data)
+                self.statusBar().clearMessage()
+            self.table_cache.put(table, self.stream_data)
+            self.value_index.index_table(table, self.stream_data)
+            self.store_table(table, self.stream_data)
+            self.save_device_cache()
+            if self.table_is_empty(self.stream_data):
+                self.table_model.set_message("There is no data in this table")
+            self.stream_data = None
+            self.fetch_request = None
+
+    def table_is_empty(self, table):
+        return table.row_count == 0 or not table.columns
+
+    def parse_table_data(self, output):
+        table = TableData()
+        for _, fields in TableParser().feed(output):
+            table.append_row(fields)
+        self.show_table(table)
 
     def save_changes(self):
-        if not self.modified_data:
+        edits = self.table_model.edits
+        if self.snapshot_file:
+            self.queue_changes()
+            return
+        if not edits:
             QMessageBox.warning(self, "Warning", "No changes to save")
             return
-        
-        self.modifications_queue = list(
-            ((row_idx, col_name, new_value) for (row_idx, col_name), new_value in self.modified_data.items())
-        )
-        
-        self.progress_bar.setMaximum(len(self.modifications_queue))
+        self.commit_table_edits(edits)
+
+    def commit_table_edits(self, edits):
+        # Baris ditulis menurut nomornya, jadi baris tanpa ViewName pun ikut
+        table = self.table_model.table
+        changes = [(self.current_table, row_idx, col_name, table.value(row_idx, col_name), new_value)
+                   for (row_idx, col_name), new_value in edits.items()]
+        self.table_cache.invalidate(self.current_table)
+        if self.device_cache:
+            self.device_cache.invalidate_table(self.current_table)
+        # Sel yang dikirim dicatat persis; edit sesudahnya tidak ikut dianggap tersimpan
+        self.start_commit(changes, {"cells": [(row, column, new) for _, row, column, _, new in changes]})
+
+    def start_commit(self, changes, extra=None):
+        self.progress_bar.setMaximum(len(changes) + 1)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
-        self.process_next_modification()
-
-    def process_next_modification(self):
-        if self.modifications_queue:
-            row_idx, col_name, new_value = self.modifications_queue.pop(0)
-            row_id = self.data_model[row_idx].get("ViewName", "")
-            if not row_id:
-                self.process_next_modification()
+        request_id = self.worker.request("commit", changes, priority=PRIORITY_WRITE)
+        self.batches[request_id] = dict({"tables": sorted({change[0] for change in changes})}, **(extra or {}))
+
+    def open_snapshot(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Open Snapshot Offline", "", "SQLite Files (*.db);;All Files (*)"
+        )
+        if not file_name:
+            return
+        try:
+            meta, catalog = read_snapshot(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open snapshot: {str(e)}")
+            return
+        # Tanpa sesi: semua perintah ke modem dihentikan, tabel dibaca dari snapshot
+        self.worker.scheduler.clear()
+        self.worker.request("disconnect", priority=PRIORITY_CONTROL)
+        self.keepalive_timer.stop()
+        self.watch_timer.stop()
+        self.watches = {}
+        self.watch_btn.setChecked(False)
+        self.prefetch_queue = []
+        self.snapshot_file = file_name
+        self.changeset = ChangeSet.for_snapshot(file_name, meta)
+        self.table_cache.clear()
+        self.current_table = None
+        self.current_table_label.setText("Selected Table: None")
+        self.table_model.set_table(TableData())
+        self.show_table_list(sorted(catalog))
+        self.statusBar().showMessage(
+            f"Offline: {os.path.basename(file_name)} ({meta.get('host', '')}, {meta.get('timestamp', '')}), "
+            f"{len(self.changeset)} queued changes")
+
+    def queue_changes(self):
+        # Mode offline: edit tabel ini menggantikan isi change set untuk
+        # tabel itu, lalu langsung disimpan ke disk
+        if not self.current_table or self.table_model.message is not None:
+            QMessageBox.warning(self, "Warning", "No changes to save")
+            return
+        self.changeset.set_table_edits(self.current_table, self.table_model.table, self.table_model.edits)
+        try:
+            self.changeset.save()
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save the change set: {str(e)}")
+            return
+        QMessageBox.information(self, "Change Set",
+                                f"{len(self.table_model.edits)} changes to {self.current_table} queued, "
+                                f"{len(self.changeset)} in total. They are checked and pushed after connecting.")
+
+    def push_change_set(self):
+        if not self.changeset or not len(self.changeset):
+            QMessageBox.information(self, "Push Change Set", "No queued changes.")
+            return
+        if self.snapshot_file:
+            QMessageBox.warning(self, "Warning", "Connect to the modem first")
+            return
+        self.statusBar().showMessage(f"Comparing {len(self.changeset)} queued changes with the modem...")
+        self.worker.request("check", self.changeset.cells(), key="check")
+
+    def handle_changes_checked(self, request_id, ready, conflicts, applied):
+        self.statusBar().clearMessage()
+        # Sel yang di modem sudah bernilai baru tidak perlu dikirim lagi
+        self.changeset.discard(applied)
+        self.changeset.save()
+        if conflicts:
+            lines = [f"{table} row {row}, {column}: snapshot had \"{base}\", modem has "
+                     + ("no such cell" if current is None else f"\"{current}\"") + f", queued \"{value}\""
+                     for table, row, column, base, current, value in conflicts]
+            if len(lines) > COMMIT_REPORT_LINES:
+                lines[COMMIT_REPORT_LINES:] = [f"... and {len(lines) - COMMIT_REPORT_LINES} more"]
+            text = (f"{len(conflicts)} queued changes conflict with the modem and stay in the change set:\n"
+                    + "\n".join(lines))
+            if not ready:
+                QMessageBox.warning(self, "Push Change Set", text)
                 return
-            cmd_set = f'sendcmd 1 DB set {self.current_table} {row_idx} {col_name} "{new_value}"'
-            self.worker.start_command.emit(cmd_set)
+            if QMessageBox.question(self, "Push Change Set",
+                                    f"{text}\n\nPush the other {len(ready)} changes?") != QMessageBox.Yes:
+                return
+        elif not ready:
+            QMessageBox.information(self, "Push Change Set", "The modem already has all queued values.")
+            return
+        for table in {change[0] for change in ready}:
+            self.table_cache.invalidate(table)
+            self.value_index.remove_table(table)
+            if self.device_cache:
+                self.device_cache.invalidate_table(table)
+        self.start_commit(ready, {"changeset": ready})
+
+    def rollback_commit(self):
+        journals = list_journals()
+        if not journals:
+            QMessageBox.information(self, "Roll Back Commit", "No commit journals found.")
+            return
+        # Commit yang terputus ke modem ini ditampilkan paling atas
+        journals.sort(key=lambda journal: not (journal.pending and journal.host == self.host))
+        items = [journal.describe() for journal in journals]
+        item, ok = QInputDialog.getItem(self, "Roll Back Commit", "Restore the old values of:", items, 0, False)
+        if not ok:
+            return
+        journal = journals[items.index(item)]
+        text = (f"Write the old values of {len(journal.changes)} cells in {', '.join(journal.tables)} "
+                f"back to the modem?")
+        if journal.host != self.host:
+            text += f"\n\nThis commit was made to {journal.host}, not to {self.host}."
+        if QMessageBox.question(self, "Roll Back Commit", text) != QMessageBox.Yes:
+            return
+        for table in journal.tables:
+            self.table_cache.invalidate(table)
+            self.value_index.remove_table(table)
+            if self.device_cache:
+                self.device_cache.invalidate_table(table)
+        self.progress_bar.setMaximum(len(journal.changes) + 1)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        request_id = self.worker.request("rollback", journal.file_name, priority=PRIORITY_WRITE)
+        self.batches[request_id] = {"tables": journal.tables, "rollback": True}
+
+    def handle_batch_progress(self, request_id, done):
+        if request_id in self.batches:
+            self.progress_bar.setValue(done)
+
+    def commit_report(self, result):
+        lines = [f"{table} row {row}, {column} = \"{new}\": {error}"
+                 for (table, row, column, _, new), error in result.get("failed", [])]
+        lines += [f"{table} row {row}, {column}: modem does not have \"{new}\" after saving"
+                  for table, row, column, _, new in result.get("mismatches", [])]
+        if len(lines) > COMMIT_REPORT_LINES:
+            lines[COMMIT_REPORT_LINES:] = [f"... and {len(lines) - COMMIT_REPORT_LINES} more"]
+        if result.get("error"):
+            lines.append(f"Commit interrupted: {result['error']}")
+        if result["state"] == "rolled_back":
+            lines.append(f"All {result['changes']} changes were rolled back, the modem has its old values again.")
         else:
-            self.progress_bar.setVisible(False)
-            QMessageBox.information(self, "Success", "Changes saved successfully!")
-            self.modified_data.clear()
-            if self.current_table:
-                self.worker.start_command.emit(f"sendcmd 1 DB p {self.current_table}")
+            problems = len(result["rollback_failed"]) + len(result["rollback_mismatches"])
+            lines.append(f"Rollback failed: {result['rollback_error']}" if result["rollback_error"]
+                         else f"Rollback failed for {problems} cells.")
+            lines.append(f"The modem may be partly updated. The old values are kept in {result['journal']}, "
+                         "use File > Roll Back Commit... to try again.")
+        return "\n".join(lines)
 
-    def process_next_command(self):
-        if self.command_queue:
-            cmd = self.command_queue.pop(0)
-            self.progress_bar.setValue(self.progress_bar.value() + 1)
-            self.worker.start_command.emit(cmd)
+    def handle_commit_finished(self, request_id, result):
+        batch = self.batches.pop(request_id, {})
+        self.progress_bar.setVisible(False)
+        state = result["state"]
+        if batch.get("changeset") and state == "committed":
+            self.changeset.discard(batch["changeset"])
+            self.changeset.save()
+        if state == "committed":
+            QMessageBox.information(self, "Success", f"{result['changes']} changes saved and verified.")
+        elif state == "rolled_back" and batch.get("rollback"):
+            QMessageBox.information(self, "Roll Back Commit",
+                                    f"The old values of {result['changes']} cells were restored and verified.")
         else:
-            self.progress_bar.setVisible(False)
-            QMessageBox.information(self, "Success", "Changes saved successfully!")
-            self.modified_data.clear()
-            if self.current_table:
-                self.worker.start_command.emit(f"sendcmd 1 DB p {self.current_table}")
+            QMessageBox.warning(self, "Warning", self.commit_report(result))
+        if self.current_table not in batch.get("tables", []):
+            return
+        if batch.get("import") or batch.get("rollback") or batch.get("changeset"):
+            # Isi tabel berubah di banyak tempat, tampilkan data dari modem
+            self.fetch_table(self.current_table)
+        elif state == "committed":
+            # Semua sel terverifikasi: cukup perbarui sel yang diubah tanpa fetch
+            for row, column, old, new in self.table_model.commit_edits(batch["cells"]):
+                self.value_index.update_cell(self.current_table, row, column, old, new)
+            self.table_cache.put(self.current_table, self.table_model.table)
+            self.store_table(self.current_table, self.table_model.table)
+        else:
+            # Edit tetap ditampilkan agar bisa diperbaiki lalu disimpan ulang
+            self.statusBar().showMessage("Changes were not saved, the edits are kept", 10000)
 
     def closeEvent(self, event):
         msg = QMessageBox(self)
@@ -620,16 +2310,39 @@ class TelnetClient(QMainWindow):
         response = msg.exec()
         
         if response == QMessageBox.Yes:
-            self.worker.start_disconnect.emit()
+            self.keepalive_timer.stop()
+            self.watch_timer.stop()
+            self.worker.stop()
             self.thread.quit()
             self.thread.wait()
+            self.worker.session.close()
+            self.save_usage()
+            self.save_device_cache()
             event.accept()
         else:
             event.ignore()
 
 
 if __name__ == "__main__":
+    # Diimpor di sini agar impor main (mis. oleh bench_startup) tetap ringan
+    import argparse
+    from profiling import PROFILE_ENV
+    parser = argparse.ArgumentParser(description="ZTE modem database editor")
+    parser.add_argument("--profile", metavar="PREFIX", default=os.environ.get(PROFILE_ENV),
+                        help="time every UI callback and run cProfile; writes PREFIX.prof and PREFIX.json on exit")
+    args, _ = parser.parse_known_args()
+    profiler = None
+    if args.profile:
+        from profiling import Profiler
+        profiler = Profiler(args.profile)
+        # Method model yang dipanggil Qt per sel tidak dibungkus
+        hot = ("data", "rowCount", "columnCount", "headerData", "flags")
+        for cls in (TelnetClient, DBTableModel, TableListModel, MetricsPanel):
+            profiler.wrap_methods(cls, exclude=hot)
+        profiler.start()
     app = QApplication([])
     window = TelnetClient()
     window.show()
-    app.exec()
\ No newline at end of file
+    app.exec()
+    if profiler:
+        profiler.dump()
\ No newline at end of file
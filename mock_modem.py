@@ -0,0 +1,222 @@
+import argparse
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+
+# Modem ZTE tiruan untuk pengujian dan benchmark tanpa perangkat fisik.
+# Meniru login telnet, "DB all", "DB p" (format XML), "DB set" dan
+# "DB save", dengan latensi per byte, pemecahan output dan error buatan.
+PROMPT = b"/ # "
+SET_PATTERN = re.compile(r'sendcmd 1 DB set (\S+) (\d+) (\S+) (?:"((?:[^"\\]|\\.)*)"|(\S*))$')
+SHELL_ESCAPE_PATTERN = re.compile(r'\\([\\"$`])')
+
+
+def generate_tables(count=20, rows=50, columns=8):
+    tables = {"DevInfo": [{"ViewName": "IGD.DevInfo", "SerialNumber": "ZTEMOCK0001",
+                           "SoftwareVer": "V9.0.0P1_MOCK", "ModelName": "F609"}]}
+    for t in range(count):
+        name = f"MockTbl{t:03d}"
+        tables[name] = [dict({"ViewName": f"IGD.{name}.{r + 1}"},
+                             **{f"Param{c:02d}": f"value{r}_{c}" for c in range(columns)})
+                        for r in range(rows)]
+    return tables
+
+
+def escape_value(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class MockModem:
+    def __init__(self, tables=None, user="root", password="Zte521", byte_delay=0.0,
+                 command_delay=0.0, chunk_size=0, error_rate=0.0, drop_rate=0.0, echo=False,
+                 max_sessions=0, seed=None):
+        self.tables = generate_tables() if tables is None else tables
+        self.user = user
+        self.password = password
+        self.byte_delay = byte_delay
+        self.command_delay = command_delay
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.echo = echo
+        self.max_sessions = max_sessions
+        self.sessions = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.saved = 0
+        self.commands = 0
+        self.server = None
+        self.thread = None
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self, host="127.0.0.1", port=0):
+        modem = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                # Seperti telnetd di modem: koneksi di atas batas langsung ditutup
+                with modem.lock:
+                    if modem.max_sessions and modem.sessions >= modem.max_sessions:
+                        return
+                    modem.sessions += 1
+                try:
+                    modem.handle_client(self.rfile, self.wfile)
+                finally:
+                    with modem.lock:
+                        modem.sessions -= 1
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.address
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        if not self.server:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def send(self, wfile, data):
+        # Kirim per potongan chunk_size byte, masing-masing ditunda sesuai
+        # byte_delay, agar klien melihat output yang datang sedikit-sedikit
+        size = self.chunk_size or len(data) or 1
+        for start in range(0, len(data), size):
+            chunk = data[start:start + size]
+            if self.byte_delay:
+                time.sleep(self.byte_delay * len(chunk))
+            wfile.write(chunk)
+            wfile.flush()
+
+    def read_line(self, rfile):
+        line = rfile.readline()
+        if not line:
+            return None
+        return line.rstrip(b"\r\n").decode("ascii", errors="replace")
+
+    def handle_client(self, rfile, wfile):
+        while True:
+            self.send(wfile, b"Login: ")
+            user = self.read_line(rfile)
+            if user is None:
+                return
+            self.send(wfile, b"Password: ")
+            password = self.read_line(rfile)
+            if password is None:
+                return
+            if user == self.user and password == self.password:
+                break
+            self.send(wfile, b"\r\nLogin incorrect\r\n")
+        self.send(wfile, b"\r\n\r\nBusyBox v1.01 (mock) Built-in shell (ash)\r\n\r\n" + PROMPT)
+        while True:
+            command = self.read_line(rfile)
+            if command is None or command.strip() in ("exit", "logout"):
+                return
+            if self.command_delay:
+                time.sleep(self.command_delay)
+            output = self.execute(command.strip()) if command.strip() else ""
+            echo = command.encode("ascii", errors="replace") + b"\r\n" if self.echo else b""
+            reply = echo + output.encode("utf-8") + PROMPT
+            if self.drop_rate and self.random.random() < self.drop_rate:
+                # Putuskan koneksi di tengah balasan, seperti idle timeout modem
+                self.send(wfile, reply[:len(reply) // 2])
+                return
+            self.send(wfile, reply)
+
+    def execute(self, command):
+        with self.lock:
+            self.commands += 1
+            if command == "sendcmd 1 DB all":
+                return "".join(f"{i}   {name}\r\n" for i, name in enumerate(self.tables))
+            if command.startswith("sendcmd 1 DB p "):
+                return self.render_table(command[len("sendcmd 1 DB p "):].strip())
+            if command.startswith("sendcmd 1 DB set "):
+                return self.set_value(command)
+            if command == "sendcmd 1 DB save":
+                if self.error_rate and self.random.random() < self.error_rate:
+                    return "DB save failed\r\n"
+                self.saved += 1
+                return ""
+            return f"-sh: {command.split()[0]}: not found\r\n"
+
+    def render_table(self, name):
+        rows = self.tables.get(name)
+        if rows is None:
+            return "<DB>\r\n</DB>\r\n"
+        parts = ["<DB>\r\n", f'<Tbl name="{name}" RowCount="{len(rows)}">\r\n']
+        for row_no, row in enumerate(rows):
+            parts.append(f'<Row No="{row_no}">\r\n')
+            parts.extend(f'<DM name="{column}" val="{escape_value(value)}"/>\r\n'
+                         for column, value in row.items())
+            parts.append("</Row>\r\n")
+        parts.append("</Tbl>\r\n</DB>\r\n")
+        return "".join(parts)
+
+    def set_value(self, command):
+        match = SET_PATTERN.match(command)
+        if not match:
+            return "DB set failed, invalid arguments\r\n"
+        table, row, column, quoted, bare = match.groups()
+        # Seperti ash: di dalam "..." hanya \ " $ dan backtick yang di-escape
+        value = SHELL_ESCAPE_PATTERN.sub(r"\1", quoted) if quoted is not None else bare
+        rows = self.tables.get(table)
+        row = int(row)
+        if rows is None or row >= len(rows):
+            return f"DB set failed, {table} row {row} not found\r\n"
+        if self.error_rate and self.random.random() < self.error_rate:
+            return "DB set failed, ret -1\r\n"
+        rows[row][column] = value
+        return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock ZTE modem telnet server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2323, help="0 picks a free port")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="Zte521")
+    parser.add_argument("--tables", type=int, default=20, help="number of generated tables")
+    parser.add_argument("--rows", type=int, default=50, help="rows per generated table")
+    parser.add_argument("--columns", type=int, default=8, help="columns per generated table")
+    parser.add_argument("--byte-delay", type=float, default=0.0, help="seconds of latency per byte sent")
+    parser.add_argument("--command-delay", type=float, default=0.0, help="seconds of latency per command")
+    parser.add_argument("--chunk", type=int, default=0, help="send output in chunks of this many bytes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of set/save commands that fail")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="fraction of commands after which the connection is dropped mid-reply")
+    parser.add_argument("--echo", action="store_true", help="echo commands back like a terminal")
+    parser.add_argument("--max-sessions", type=int, default=0, help="refuse connections above this many (0: no limit)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    modem = MockModem(generate_tables(args.tables, args.rows, args.columns), user=args.user,
+                      password=args.password, byte_delay=args.byte_delay,
+                      command_delay=args.command_delay, chunk_size=args.chunk,
+                      error_rate=args.error_rate, drop_rate=args.drop_rate, echo=args.echo,
+                      max_sessions=args.max_sessions, seed=args.seed)
+    print(f"listening on {modem.start(args.host, args.port)}", flush=True)
+    try:
+        modem.thread.join()
+    except KeyboardInterrupt:
+        modem.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
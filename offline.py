@@ -0,0 +1,89 @@
+import json
+import os
+
+from core import DeviceCache
+from journal import current_value, read_tables
+
+# Edit offline terhadap snapshot SQLite. Sel yang diubah dikumpulkan di
+# change set (file JSON di samping snapshot) bersama nilai dasarnya dari
+# snapshot. Saat tersambung ke modem, tiap sel dibandingkan dengan isi
+# modem: bila masih sama dengan nilai dasar sel itu siap dikirim, bila
+# sudah berubah di modem sel itu konflik dan tetap di change set.
+CHANGESET_SUFFIX = ".changes.json"
+
+
+class ChangeSet:
+    def __init__(self, file_name, snapshot="", host=""):
+        self.file_name = file_name
+        self.snapshot = snapshot
+        self.host = host
+        self.changes = {}
+        self.load()
+
+    @classmethod
+    def for_snapshot(cls, snapshot_file, meta):
+        return cls(snapshot_file + CHANGESET_SUFFIX, snapshot_file, meta.get("host", ""))
+
+    def load(self):
+        try:
+            with open(self.file_name, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.snapshot = stored.get("snapshot", self.snapshot)
+        self.host = stored.get("host", self.host)
+        self.changes = {(c["table"], c["row"], c["column"]): (c["base"], c["value"])
+                        for c in stored.get("changes", [])}
+
+    def save(self):
+        if not self.changes:
+            try:
+                os.remove(self.file_name)
+            except OSError:
+                pass
+            return
+        changes = [{"table": table, "row": row, "column": column, "base": base, "value": value}
+                   for (table, row, column), (base, value) in sorted(self.changes.items())]
+        DeviceCache.write_json(self.file_name, {"snapshot": self.snapshot, "host": self.host, "changes": changes})
+
+    def __len__(self):
+        return len(self.changes)
+
+    @property
+    def tables(self):
+        return sorted({table for table, _, _ in self.changes})
+
+    def cells(self):
+        # (tabel, baris, kolom, nilai dasar, nilai baru)
+        return [key + values for key, values in sorted(self.changes.items())]
+
+    def table_edits(self, table):
+        return {(row, column): value for (name, row, column), (_, value) in self.changes.items() if name == table}
+
+    def set_table_edits(self, table, data, edits):
+        # Ganti semua perubahan tabel itu dengan edit yang sedang tampil
+        self.changes = {key: values for key, values in self.changes.items() if key[0] != table}
+        for (row, column), value in edits.items():
+            self.changes[(table, row, column)] = (data.value(row, column), value)
+
+    def discard(self, cells):
+        for cell in cells:
+            self.changes.pop(tuple(cell[:3]), None)
+
+
+def check_changes(session, cells):
+    # Bandingkan change set dengan isi modem, satu "DB p" per tabel. Hasilnya
+    # (siap dikirim sebagai perubahan journal, konflik sebagai (tabel, baris,
+    # kolom, nilai dasar, nilai di modem, nilai baru), sel yang sudah bernilai
+    # baru di modem).
+    tables = read_tables(session, cells)
+    ready, conflicts, applied = [], [], []
+    for table, row, column, base, value in cells:
+        current = current_value(tables[table], row, column)
+        if current == value:
+            applied.append((table, row, column, base, value))
+        elif current == base:
+            ready.append((table, row, column, current, value))
+        else:
+            conflicts.append((table, row, column, base, current, value))
+    return ready, conflicts, applied
@@ -0,0 +1,78 @@
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from collections import defaultdict, deque
+
+from core import percentile
+
+# Profiling opt-in untuk GUI: aktif lewat "main.py --profile PREFIX" atau
+# variabel lingkungan ZDBEDIT_PROFILE=PREFIX. Tiap callback UI dibungkus
+# span waktu, cProfile berjalan di thread GUI, dan saat keluar hasilnya
+# ditulis ke PREFIX.prof (pstats) dan PREFIX.json (ringkasan span).
+PROFILE_ENV = "ZDBEDIT_PROFILE"
+SPAN_SAMPLES = 10000
+
+
+class Profiler:
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.profile = cProfile.Profile()
+        self.spans = defaultdict(lambda: deque(maxlen=SPAN_SAMPLES))
+        self.counts = defaultdict(int)
+        self.totals = defaultdict(float)
+
+    def record(self, name, elapsed):
+        self.spans[name].append(elapsed)
+        self.counts[name] += 1
+        self.totals[name] += elapsed
+
+    def wrap(self, name, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def wrap_methods(self, cls, exclude=()):
+        # Bungkus semua method yang didefinisikan di kelas itu sendiri
+        # (bukan turunan Qt); harus sebelum objeknya dibuat agar koneksi
+        # sinyal memakai versi yang dibungkus
+        for name, value in list(vars(cls).items()):
+            if callable(value) and not name.startswith("__") and name not in exclude:
+                setattr(cls, name, self.wrap(f"{cls.__name__}.{name}", value))
+
+    def start(self):
+        self.profile.enable()
+
+    def summary(self):
+        result = {}
+        for name in sorted(self.totals, key=self.totals.get, reverse=True):
+            samples = list(self.spans[name])
+            result[name] = {
+                "count": self.counts[name],
+                "total_ms": self.totals[name] * 1000,
+                "mean_ms": self.totals[name] / self.counts[name] * 1000,
+                "p50_ms": percentile(samples, 0.5) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+                "max_ms": max(samples) * 1000,
+            }
+        return result
+
+    def dump(self):
+        self.profile.disable()
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.profile.dump_stats(self.prefix + ".prof")
+        with open(self.prefix + ".json", 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"Profile written to {self.prefix}.prof and {self.prefix}.json", file=sys.stderr)
+        # pstats (~25 ms impor) hanya dibutuhkan untuk ringkasan ini
+        import pstats
+        pstats.Stats(self.profile, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
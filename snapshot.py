@@ -0,0 +1,172 @@
+import os
+import sqlite3
+from datetime import datetime
+
+from core import TableData, device_info, parse_table_list
+
+# Snapshot database modem dalam satu file SQLite: satu tabel SQLite per
+# tabel modem (kolom _row = nomor baris), ditambah _tables dan _meta.
+META_TABLE = "_meta"
+CATALOG_TABLE = "_tables"
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SnapshotWriter:
+    # Ditulis ke file sementara di direktori yang sama dan baru menggantikan
+    # file_name saat close(), jadi dump yang gagal tidak merusak snapshot lama
+    def __init__(self, file_name, host="", firmware="", extra=None):
+        self.file_name = file_name
+        self.temp_name = file_name + ".tmp"
+        if os.path.exists(self.temp_name):
+            os.remove(self.temp_name)
+        self.conn = sqlite3.connect(self.temp_name)
+        # File baru yang bisa dibuat ulang kapan saja, jadi tidak perlu journal
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute(f"CREATE TABLE {CATALOG_TABLE} (name TEXT PRIMARY KEY, rows INTEGER, columns TEXT)")
+            meta = {"host": host, "firmware": firmware,
+                    "timestamp": datetime.now().isoformat(timespec="seconds")}
+            meta.update(extra or {})
+            self.conn.executemany(f"INSERT INTO {META_TABLE} VALUES (?, ?)", meta.items())
+
+    def add_table(self, name, data):
+        table = quote_identifier(name)
+        columns = [quote_identifier(column) for column in data.columns]
+        definition = ", ".join(["_row INTEGER PRIMARY KEY"] + [f"{column} TEXT" for column in columns])
+        placeholders = ", ".join("?" * (len(columns) + 1))
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE {table} ({definition})")
+            self.conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})",
+                                  ([row_idx] + row for row_idx, row in enumerate(data.rows())))
+            self.conn.execute(f"INSERT INTO {CATALOG_TABLE} VALUES (?, ?, ?)",
+                              (name, data.row_count, "\t".join(data.columns)))
+
+    def close(self, keep=True):
+        self.conn.close()
+        if keep:
+            os.replace(self.temp_name, self.file_name)
+        else:
+            os.remove(self.temp_name)
+
+
+def dump_database(session, file_name, tables=None, on_progress=None):
+    if tables is None:
+        tables = parse_table_list(session.command("sendcmd 1 DB all"))
+    info = device_info(session)
+    writer = SnapshotWriter(file_name, host=session.host or "", firmware=info.get("firmware", ""),
+                            extra={key: value for key, value in info.items() if key != "firmware"})
+    done = 0
+
+    def on_table(name, data):
+        nonlocal done
+        writer.add_table(name, data)
+        done += 1
+        if on_progress:
+            on_progress(done, len(tables))
+
+    try:
+        session.read_tables(tables, on_table)
+    except BaseException:
+        writer.close(keep=False)
+        raise
+    writer.close()
+    return len(tables)
+
+
+def read_meta(conn, schema="main"):
+    return dict(conn.execute(f"SELECT key, value FROM {schema}.{META_TABLE}"))
+
+
+def read_catalog(conn, schema="main"):
+    return {name: columns.split("\t") if columns else []
+            for name, columns in conn.execute(f"SELECT name, columns FROM {schema}.{CATALOG_TABLE}")}
+
+
+def open_snapshot(file_name):
+    # sqlite3.connect membuat file kosong bila belum ada
+    if not os.path.isfile(file_name):
+        raise FileNotFoundError(f"No such snapshot: {file_name}")
+    return sqlite3.connect(file_name)
+
+
+def read_snapshot(file_name):
+    # Hasilnya (meta, {tabel: kolom}) untuk dibuka offline
+    conn = open_snapshot(file_name)
+    try:
+        return read_meta(conn), read_catalog(conn)
+    finally:
+        conn.close()
+
+
+def read_snapshot_table(file_name, name):
+    conn = open_snapshot(file_name)
+    try:
+        columns = read_catalog(conn).get(name)
+        if columns is None:
+            raise KeyError(f"Table {name} is not in {file_name}")
+        rows = conn.execute(f"SELECT * FROM {quote_identifier(name)} ORDER BY _row").fetchall()
+    finally:
+        conn.close()
+    data = TableData()
+    data.columns = columns
+    data.values = {column: ["" if row[i] is None else row[i] for row in rows]
+                   for i, column in enumerate(columns, 1)}
+    data.row_count = len(rows)
+    return data
+
+
+def diff_snapshots(old_file, new_file):
+    # Bandingkan dua snapshot lewat join pada _row (primary key), sehingga
+    # hanya baris yang benar-benar berbeda yang dibaca ke Python.
+    conn = open_snapshot(old_file)
+    try:
+        open_snapshot(new_file).close()
+        conn.execute("ATTACH DATABASE ? AS new", (new_file,))
+        old_tables = read_catalog(conn)
+        new_tables = read_catalog(conn, "new")
+        result = {
+            "old": read_meta(conn),
+            "new": read_meta(conn, "new"),
+            "added_tables": sorted(new_tables.keys() - old_tables.keys()),
+            "removed_tables": sorted(old_tables.keys() - new_tables.keys()),
+            "tables": {},
+        }
+        for name in sorted(old_tables.keys() & new_tables.keys()):
+            table = quote_identifier(name)
+            old_columns, new_columns = old_tables[name], new_tables[name]
+            common = [column for column in old_columns if column in new_columns]
+            changes = []
+            if common:
+                pairs = ", ".join(f"o.{quote_identifier(c)}, n.{quote_identifier(c)}" for c in common)
+                differs = " OR ".join(f"o.{quote_identifier(c)} IS NOT n.{quote_identifier(c)}" for c in common)
+                query = (f"SELECT o._row, {pairs} FROM main.{table} o "
+                         f"JOIN new.{table} n ON n._row = o._row WHERE {differs} ORDER BY o._row")
+                for row in conn.execute(query):
+                    for i, column in enumerate(common):
+                        old, new = row[1 + 2 * i], row[2 + 2 * i]
+                        if old != new:
+                            changes.append({"row": row[0], "column": column, "old": old, "new": new})
+            added_rows = [row for row, in conn.execute(
+                f"SELECT n._row FROM new.{table} n LEFT JOIN main.{table} o ON o._row = n._row "
+                f"WHERE o._row IS NULL ORDER BY n._row")]
+            removed_rows = [row for row, in conn.execute(
+                f"SELECT o._row FROM main.{table} o LEFT JOIN new.{table} n ON n._row = o._row "
+                f"WHERE n._row IS NULL ORDER BY o._row")]
+            added_columns = [column for column in new_columns if column not in old_columns]
+            removed_columns = [column for column in old_columns if column not in new_columns]
+            if changes or added_rows or removed_rows or added_columns or removed_columns:
+                result["tables"][name] = {
+                    "changes": changes,
+                    "added_rows": added_rows,
+                    "removed_rows": removed_rows,
+                    "added_columns": added_columns,
+                    "removed_columns": removed_columns,
+                }
+        return result
+    finally:
+        conn.close()
@@ -0,0 +1,134 @@
+import csv
+import json
+import os
+import tempfile
+
+# Ekspor dan impor satu tabel modem sebagai CSV atau JSON Lines. Kolom _row
+# berisi nomor baris (urutan baris di tabel, seperti di snapshot dan
+# perintah "DB set"). Impor hanya mengirim sel yang berbeda dari data modem.
+ROW_COLUMN = "_row"
+
+
+def table_format(file_name):
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Unknown table file type '{extension}', use .csv or .jsonl")
+
+
+class TableWriter:
+    # Tulis baris hasil TableParser tanpa menampung tabel di memori. JSON
+    # Lines langsung ke file. Untuk CSV header harus memuat semua kolom,
+    # termasuk yang baru muncul di baris belakang, jadi baris ditampung dulu
+    # di file sementara dan CSV ditulis saat close(). Seperti SnapshotWriter,
+    # hasilnya baru menggantikan file_name saat close(), jadi ekspor yang
+    # gagal tidak meninggalkan file terpotong.
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.temp_name = file_name + ".tmp"
+        self.format = table_format(file_name)
+        self.file = open(self.temp_name, 'w', newline='', encoding='utf-8')
+        self.spool = tempfile.TemporaryFile('w+', encoding='utf-8') if self.format == "csv" else None
+        self.reset()
+
+    def reset(self):
+        # Dipanggil juga saat tabel di-stream ulang setelah sambung ulang
+        for f in (self.file, self.spool):
+            if f:
+                f.seek(0)
+                f.truncate()
+        self.columns = set()
+        self.rows = 0
+
+    def write_rows(self, rows):
+        for _, fields in rows:
+            values = dict(fields)
+            if self.spool:
+                self.columns.update(values)
+                self.spool.write(json.dumps(values, ensure_ascii=False) + "\n")
+            else:
+                self.file.write(json.dumps(dict({ROW_COLUMN: self.rows}, **values), ensure_ascii=False) + "\n")
+            self.rows += 1
+
+    def close(self, keep=True):
+        if self.spool and keep:
+            columns = sorted(self.columns)
+            writer = csv.writer(self.file)
+            writer.writerow([ROW_COLUMN] + columns)
+            self.spool.seek(0)
+            for row, line in enumerate(self.spool):
+                values = json.loads(line)
+                writer.writerow([row] + [values.get(column, "") for column in columns])
+        if self.spool:
+            self.spool.close()
+        self.file.close()
+        if keep:
+            os.replace(self.temp_name, self.file_name)
+        else:
+            os.remove(self.temp_name)
+
+
+def export_table(session, table, file_name, on_progress=None):
+    # Hasilnya jumlah baris yang ditulis
+    writer = TableWriter(file_name)
+
+    def on_rows(rows):
+        writer.write_rows(rows)
+        if on_progress:
+            on_progress(writer.rows)
+
+    try:
+        session.stream_table(table, on_rows, on_retry=writer.reset)
+    except BaseException:
+        writer.close(keep=False)
+        raise
+    writer.close()
+    return writer.rows
+
+
+def read_table_file(file_name):
+    # Hasilkan (nomor baris, {kolom: nilai}) satu per satu. Tanpa kolom _row,
+    # nomor baris mengikuti urutan di file.
+    file_format = table_format(file_name)
+    with open(file_name, 'r', newline='', encoding='utf-8-sig') as f:
+        if file_format == "csv":
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for index, record in enumerate(records):
+            row = record.pop(ROW_COLUMN, None)
+            try:
+                row = index if row in (None, "") else int(row)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {ROW_COLUMN} '{row}' in record {index + 1}")
+            # Sel kosong di file tetap dibandingkan; sel yang tidak ada
+            # (baris CSV pendek, null di JSON) dilewati
+            yield row, {column: str(value) for column, value in record.items()
+                        if column is not None and value is not None}
+
+
+def diff_table_file(data, file_name):
+    # Bandingkan isi file dengan data tabel dari modem. Hasilnya daftar
+    # (baris, kolom, nilai lama, nilai baru) yang berbeda, plus masalah yang
+    # dilewati: baris di luar tabel dan kolom yang tidak dikenal.
+    changes = []
+    missing_rows = []
+    unknown_columns = set()
+    for row, values in read_table_file(file_name):
+        if not 0 <= row < data.row_count:
+            missing_rows.append(row)
+            continue
+        for column, value in values.items():
+            current = data.values.get(column)
+            if current is None:
+                unknown_columns.add(column)
+            elif current[row] != value:
+                changes.append((row, column, current[row], value))
+    return changes, {"missing_rows": missing_rows, "unknown_columns": sorted(unknown_columns)}
+
+
+def import_changes(table, changes):
+    # Dalam bentuk perubahan journal commit
+    return [(table, row, column, old, new) for row, column, old, new in changes]